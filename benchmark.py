@@ -0,0 +1,294 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+import numpy as np
+import pandas as pd
+
+
+# Times the slow parts of Death_and_Statistics.py and the death_and_statistics
+# package against made up data shaped like the CDC export, at a few different
+# sizes, and appends the numbers to benchmark_results.csv so runs from
+# different versions can be lined up.
+#
+#   python benchmark.py
+#   python benchmark.py --scales county california --repeat 10
+
+
+here         = os.path.dirname(os.path.abspath(__file__))
+script_path  = os.path.join(here, 'Death_and_Statistics.py')
+results_path = os.path.join(here, 'benchmark_results.csv')
+
+sys.path.insert(0, here)
+
+import death_and_statistics as ds
+from death_and_statistics import dataset, query
+
+
+
+# ------------------------------ Synthetic Data ------------------------------ #
+
+# States, counties per state, years and causes per county/year/age group
+scales = {'county':     {'states':    1
+                        ,'counties':  1
+                        ,'years':    18
+                        ,'causes':   30}
+         ,'california': {'states':    1
+                        ,'counties': 58
+                        ,'years':    18
+                        ,'causes':   30}
+         ,'national':   {'states':   50
+                        ,'counties': 20
+                        ,'years':    18
+                        ,'causes':   15}
+         }
+
+age_groups = [['1',     '< 1 year']
+             ,['1-4',   '1-4 years']
+             ,['5-9',   '5-9 years']
+             ,['10-14', '10-14 years']
+             ,['15-19', '15-19 years']
+             ,['20-24', '20-24 years']
+             ,['25-34', '25-34 years']
+             ,['35-44', '35-44 years']
+             ,['45-54', '45-54 years']
+             ,['55-64', '55-64 years']
+             ,['65-74', '65-74 years']
+             ,['75-84', '75-84 years']
+             ,['85',    '85+ years']
+             ,['NS',    'Not Stated']
+             ]
+
+# The script's own plots ask for these by name, so they always have to exist
+required_causes = ['X93', 'X94', 'X95', 'Y35.0', 'X72', 'X73', 'X74']
+
+
+def cause_pool(size = 300):
+
+    codes = list(required_causes)
+    rng   = np.random.default_rng(0)
+
+    while len(codes) < size:
+        code = (chr(ord('A') + rng.integers(25))
+                + '{:02d}'.format(rng.integers(100))
+                + '.{}'.format(rng.integers(10)))
+        if code not in codes:
+            codes.append(code)
+
+    return np.array(codes)
+
+
+
+# California is always state 6 and always has county 6073 in it, the same as
+# the real file, so the script's hard coded choices work at every scale
+def county_codes(states, counties):
+
+    state_codes = [6] + [code for code in range(1, 57) if code != 6][:states - 1]
+    rows        = []
+
+    for state in state_codes:
+        numbers = [2 * county + 1 for county in range(counties)]
+        if state == 6 and 73 not in numbers:
+            numbers[-1] = 73
+        for number in numbers:
+            rows.append([state, state * 1000 + number])
+
+    return np.array(rows)
+
+
+
+def synthetic_csv(path, states, counties, years, causes, seed = 0):
+
+    rng   = np.random.default_rng(seed)
+    pool  = cause_pool()
+    place = county_codes(states, counties)
+    year  = np.arange(2017 - years, 2017)
+
+    # One cell per county, year and age group
+    cells      = len(place) * len(year) * len(age_groups)
+    cell_place = np.repeat(np.arange(len(place)), len(year) * len(age_groups))
+    cell_year  = np.tile(np.repeat(year, len(age_groups)), len(place))
+    cell_age   = np.tile(np.arange(len(age_groups)), len(place) * len(year))
+    cell_pop   = rng.integers(1000, 500000, size = cells)
+
+    # Age not stated only ever gets a single row, so the Population ffill in the
+    # cleaning never has to cover more than one missing value in a row
+    per_cell   = np.where(cell_age == len(age_groups) - 1, 1, causes)
+    row_cell   = np.repeat(np.arange(cells), per_cell)
+    row_offset = np.arange(len(row_cell)) - np.repeat(np.cumsum(per_cell) - per_cell, per_cell)
+
+    # Each cell takes a run of distinct causes from a random spot in the pool.
+    # The first cell starts at the front so the required causes are in there
+    cell_start    = rng.integers(len(pool), size = cells)
+    cell_start[0] = 0
+    row_cause     = (cell_start[row_cell] + row_offset) % len(pool)
+
+    deaths     = rng.poisson(25, size = len(row_cell)) + 1
+    population = cell_pop[row_cell]
+    rate       = deaths / population * 100000
+    not_stated = cell_age[row_cell] == len(age_groups) - 1
+
+    crude_rate = pd.Series(rate).round(1).astype(str)
+    crude_rate = crude_rate.where(deaths >= 20, crude_rate + ' (Unreliable)')
+    crude_se   = pd.Series(rate / np.sqrt(deaths)).round(1).astype(str)
+
+    age    = np.array(age_groups)
+    state  = place[cell_place[row_cell], 0]
+    county = place[cell_place[row_cell], 1]
+
+    raw_df = pd.DataFrame({'Year':                      cell_year[row_cell]
+                          ,'Year Code':                 cell_year[row_cell]
+                          ,'State':                     np.char.add('State ', state.astype(str))
+                          ,'State Code':                state
+                          ,'County':                    np.char.add('County ', county.astype(str))
+                          ,'County Code':               county
+                          ,'Age Group':                 age[cell_age[row_cell], 1]
+                          ,'Age Group Code':            age[cell_age[row_cell], 0]
+                          ,'Cause of death':            np.char.add('Cause ', pool[row_cause])
+                          ,'Cause of death Code':       pool[row_cause]
+                          ,'Deaths':                    deaths
+                          ,'Population':                population.astype(str)
+                          ,'Crude Rate':                crude_rate
+                          ,'Crude Rate Standard Error': crude_se
+                          })
+
+    for column in ['Population', 'Crude Rate', 'Crude Rate Standard Error']:
+        raw_df.loc[not_stated, column] = 'Not Applicable'
+
+    raw_df.to_csv(path, index = False)
+
+    return len(raw_df)
+
+# ------------------------------ Synthetic Data ------------------------------ #
+
+
+
+# -------------------------------- Benchmarks -------------------------------- #
+
+def timed(function, repeat):
+
+    times = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+
+    return np.median(times), np.min(times)
+
+
+
+def git_commit():
+
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD']
+                             ,cwd = here
+                             ,capture_output = True
+                             ,text = True).stdout.strip()
+    except OSError:
+        return ''
+
+
+
+# Choices the script actually uses, plus an all blank one
+filter_choices = {'one county, one year, one age': [2016, 6, 6073, '20-24', '']
+                 ,'one county, all years':         ['', 6, 6073, '', '']
+                 ,'one state':                     ['', 6, '', '', '']
+                 ,'firearm causes':                ['', '', '', '', ['X93', 'X94', 'X95', 'Y35.0', 'X72', 'X73', 'X74']]
+                 ,'everything':                    ['', '', '', '', '']
+                 }
+
+
+def run_scale(name, repeat, work_dir):
+
+    settings = scales[name]
+    csv_path = os.path.join(work_dir, name + '.csv')
+    rows     = synthetic_csv(csv_path, **settings)
+    results  = []
+
+    def record(step, function, times = repeat):
+        median, best = timed(function, times)
+        results.append([name, rows, step, median, best, times])
+        print('{:<12} {:<45} {:>10.4f}s'.format(name, step, median))
+
+    # Each scale gets its own working directory, so the parquet cache starts
+    # cold the first time and is warm after that
+    scale_dir = os.path.join(work_dir, name)
+    os.makedirs(scale_dir, exist_ok = True)
+    os.chdir(scale_dir)
+
+    # The whole script start to finish, plots drawn off screen
+    script_env = dict(os.environ, CDC_MORTALITY_CSV = csv_path, MPLBACKEND = 'Agg')
+
+    def run_script():
+        subprocess.run([sys.executable, script_path], env = script_env, check = True)
+
+    record('script run, cold cache', run_script, times = 1)
+    record('script run, warm cache', run_script, times = 1)
+
+    raw_df = pd.read_csv(csv_path, low_memory = False)
+
+    record('read csv',     lambda: pd.read_csv(csv_path, low_memory = False))
+    record('clean',        lambda: ds.clean_df(raw_df))
+    record('compact',      lambda: ds.compact_df(ds.clean_df(raw_df)))
+    record('load cached',  lambda: ds.load_df(csv_path))
+
+    ds.set_df(ds.load_df(csv_path))
+
+    record('build encoding', lambda: dataset.build_encoding(ds.get_df()))
+    record('build cube',     lambda: dataset.build_cube(ds.get_df()))
+
+    for label, choice in filter_choices.items():
+        record('df_filter ' + label, lambda: query.compute_filter(list(choice)))
+
+    record('df_filter cached',        lambda: ds.df_filter([2016, 6, 6073, '20-24', '']))
+    record('df_graphing one county',  lambda: query.compute_graphing(['', 6, 6073, '', '']))
+    record('df_graphing ages layers', lambda: query.compute_graphing_layers(['', 6, 6073, '', ''], 3))
+    record('df_graphing cause layers'
+          ,lambda: query.compute_graphing_layers(['', 6, 6073, '', filter_choices['firearm causes'][4]], 4))
+
+    def donut():
+        ds.clear_query_cache()
+        ds.donut_data([2016, 6, 6073, '20-24', ''])
+
+    record('donut top 5', donut)
+    record('donut table, whole state', lambda: query.donut_table(ds.df_filter(['', 6, '', '', ''])))
+    record('rates by year, county and cause'
+          ,lambda: ds.rate_table(['', 6, '', '', ''], by = ['Year', 'County Code', 'Cause of Death Code']))
+
+    return results
+
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'Benchmark Death_and_Statistics.py on synthetic CDC data')
+    parser.add_argument('--scales', nargs = '+', default = list(scales), choices = list(scales))
+    parser.add_argument('--repeat', type = int, default = 5)
+    arguments = parser.parse_args()
+
+    commit  = git_commit()
+    started = pd.Timestamp.now().isoformat(timespec = 'seconds')
+    results = []
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name in arguments.scales:
+            results += run_scale(name, arguments.repeat, work_dir)
+        os.chdir(here)
+
+    results_df = pd.DataFrame(results, columns = ['Scale', 'Rows', 'Step', 'Median (s)', 'Best (s)', 'Repeats'])
+    results_df.insert(0, 'Commit', commit)
+    results_df.insert(0, 'Run',    started)
+
+    results_df.to_csv(results_path
+                     ,mode   = 'a'
+                     ,index  = False
+                     ,header = not os.path.exists(results_path))
+
+
+if __name__ == '__main__':
+    main()
+
+# -------------------------------- Benchmarks -------------------------------- #
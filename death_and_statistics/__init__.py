@@ -0,0 +1,43 @@
+# The data side of Death_and_Statistics.py as something that can be imported.
+# Nothing gets read until it's asked for: the dataset loads the first time a
+# query runs or one of the lazy attributes below is touched, and plotting
+# lives in death_and_statistics.plots so matplotlib only loads when it's used
+
+from .codes import *
+from .cleaning import CLEANING_VERSION, clean_df, compact_df, memory_report
+from .storage import (source_path, cache_dir, store_dir, load_df, load_store, write_part, read_partitions, migrate_store
+                     ,clean_chunks, ingest_chunks, ingest_directory)
+from .dataset import dimensions, get_df, set_df, get_dictionary, append_df, append_export
+from .taxonomy import (taxonomy_levels, cause_taxonomy, cause_groups, taxonomy_conflicts
+                      ,group_codes, cause_group_column)
+from .query import (error_prev, df_filter, df_graphing, df_graphing_layers, df_group_totals, donut_data
+                   ,df_table, top_n_others, population_total, map_values, map_matrix, df_filter_store
+                   ,query_cache_info, clear_query_cache)
+from .rates import standard_population, rate_table
+from .mapped import mapped_dir, write_mapped, load_mapped, mapped_df, mapped_mask, mapped_sum
+from . import dataset
+
+
+# These used to be plain globals in the script, they're still reachable the
+# same way but only get worked out the first time they're looked at. The old
+# code -> name dicts are now just the column dictionaries as plain dicts
+lazy_attributes = {'df':               dataset.get_df
+                  ,'encoding':         dataset.get_encoding
+                  ,'death_cube':       dataset.get_death_cube
+                  ,'causes':           dataset.get_causes
+                  ,'causes_codes':     dataset.get_causes_codes
+                  ,'default':          dataset.get_default
+                  ,'cause_code_dict':  lambda: get_dictionary('Cause of Death Code').to_dict()
+                  ,'county_code_dict': lambda: get_dictionary('County Code').to_dict()
+                  ,'age_code_dict':    lambda: get_dictionary('Age Group Code').to_dict()
+                  ,'county_dict':      lambda: dict(zip(get_dictionary('County Code').values
+                                                       ,get_dictionary('County Code').index))
+                  }
+
+
+def __getattr__(name):
+
+    if name in lazy_attributes:
+        return lazy_attributes[name]()
+
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__, name))
@@ -0,0 +1,157 @@
+import pandas as pd
+
+
+# Data pulled from the CDC website. Had to merge once for each year at minimum
+# The data was very clean, though in working through the project I've had a few
+# minor things to change still
+
+
+# Bump this whenever clean_df or compact_df changes so old caches stop being
+# picked up
+CLEANING_VERSION = 3
+
+
+# ----- Cleaning Rules ----- #
+# Everything that gets done to the raw CDC columns, in one place. Each parser
+# takes a raw column and hands back the clean one, and clean_df builds the new
+# frame from them in one go instead of copying the whole thing at every step
+
+dropped_columns  = ['Year Code']
+
+renamed_columns  = {'Cause of death':      'Cause of Death'
+                   ,'Cause of death Code': 'Cause of Death Code'
+                   }
+
+missing_value    = 'Not Applicable'
+unreliable_regex = r'\s*\(Unreliable\)\s*$'
+
+# '1-4 years' -> '1 - 4 years', to match the labels in age_groups
+age_group_regex  = r'^(\d+)-(\d+) years$'
+age_group_label  = r'\1 - \2 years'
+
+
+def parse_number(column):
+
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype('float')
+
+    column = column.mask(column == missing_value)
+    column = column.str.replace(unreliable_regex, '', regex = True)
+
+    return pd.to_numeric(column)
+
+
+
+def parse_population(column):
+    return parse_number(column).ffill(limit = 1).astype('int64')
+
+
+
+# Only the handful of distinct labels go through the regex, then every row just
+# looks its label up
+def parse_age_group(column):
+
+    labels = column.dropna().unique()
+    labels = dict(zip(labels, pd.Series(labels).str.replace(age_group_regex
+                                                            ,age_group_label
+                                                            ,regex = True)))
+
+    return column.map(labels)
+
+
+
+column_parsers   = {'Population':                parse_population
+                   ,'Crude Rate':                parse_number
+                   ,'Crude Rate Standard Error': parse_number
+                   ,'Age Group':                 parse_age_group
+                   }
+
+
+def clean_df(df):
+
+    columns = {renamed_columns.get(name, name): df[name]
+               for name in df.columns
+               if name not in dropped_columns}
+
+    for name, parser in column_parsers.items():
+        if name in columns:
+            columns[name] = parser(columns[name])
+
+    return pd.DataFrame(columns)
+# ----- Cleaning Rules ----- #
+
+
+
+# The text columns repeat the same few hundred values on every row, so they're
+# much smaller as categories. Numbers get the smallest width that still fits
+category_columns = ['State'
+                   ,'County'
+                   ,'Age Group'
+                   ,'Age Group Code'
+                   ,'Cause of Death'
+                   ,'Cause of Death Code'
+                   ]
+integer_columns  = ['Year'
+                   ,'State Code'
+                   ,'County Code'
+                   ,'Deaths'
+                   ,'Population'
+                   ]
+float_columns    = ['Crude Rate'
+                   ,'Crude Rate Standard Error'
+                   ]
+
+
+def compact_df(df):
+
+    df = df.copy(deep = False)
+
+    for column in category_columns:
+        if column in df:
+            df[column] = df[column].astype('category')
+
+    for column in integer_columns:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], downcast = 'integer')
+
+    for column in float_columns:
+        if column in df:
+            df[column] = pd.to_numeric(df[column], downcast = 'float')
+
+    return df
+
+
+
+# Per column memory in MB before and after compact_df
+def memory_report(before, after):
+
+    megabyte = 1024 ** 2
+    report   = pd.DataFrame({'Before (MB)': before.memory_usage(deep = True, index = False) / megabyte
+                            ,'After (MB)':  after.memory_usage( deep = True, index = False) / megabyte})
+
+    report.loc['Total'] = report.sum()
+    report['Saved (%)'] = (1 - report['After (MB)'] / report['Before (MB)']) * 100
+
+    return report.round(2)
+
+
+
+# Forcing these to text means every chunk parses the same way, otherwise a chunk
+# that happens to only hold numeric looking codes comes out as ints
+raw_dtypes   = {'Age Group Code':            str
+               ,'Cause of death Code':       str
+               ,'Population':                str
+               ,'Crude Rate':                str
+               ,'Crude Rate Standard Error': str
+               }
+
+# Fixed widths rather than downcasting per chunk, so every part file in the
+# store has the same schema
+store_dtypes = {'Year':                      'int16'
+               ,'State Code':                'int8'
+               ,'County Code':               'int32'
+               ,'Deaths':                    'int32'
+               ,'Population':                'int32'
+               ,'Crude Rate':                'float32'
+               ,'Crude Rate Standard Error': 'float32'
+               }
@@ -0,0 +1,558 @@
+# Codes used to pick out parts of the CDC data. The giant lists group the
+# ICD-10 cause of death codes that show up in the data into something readable.
+# Years, states and counties aren't listed here, they come from whatever data
+# is loaded (see dataset.get_default) so new years and states just show up
+
+
+# Every age group the CDC uses
+age_group_codes = ['1'
+                  ,'1-4'
+                  ,'5-9'
+                  ,'10-14'
+                  ,'15-19'
+                  ,'20-24'
+                  ,'25-34'
+                  ,'35-44'
+                  ,'45-54'
+                  ,'55-64'
+                  ,'65-74'
+                  ,'75-84'
+                  ,'85'
+                  ,'NS'
+                  ]
+age_groups      = ['< 1 year'
+                   ,'1 - 4 years'
+                   ,'5 - 9 years'
+                   ,'10 - 14 years'
+                   ,'15 - 19 years'
+                   ,'20 - 24 years'
+                   ,'25 - 34 years'
+                   ,'35 - 44 years'
+                   ,'45 - 54 years'
+                   ,'55 - 64 years'
+                   ,'65 - 74 years'
+                   ,'75 - 84 years'
+                   ,'85+ years'
+                   ,'Not Stated'
+               ]
+
+
+
+# --------------- Giant lists of Death Codes -------------------- #
+
+# --------------- Medical --------------- #
+
+
+# ---------- Cancer ---------- #
+Oral_Cancer       = ['C02.9'
+                    ,'C06.9'
+                    ,'C07'
+                    ,'C09.9'
+                    ,'C11.9'
+                    ,'C14.0'
+                    ,'C15.9'
+                    ]
+
+GI_Cancer         = ['C16.9'
+                    ,'C17.0'
+                    ,'C18.2'
+                    ,'C18.7'
+                    ,'C18.9'
+                    ,'C19'
+                    ,'C20'
+                    ,'C22.0'
+                    ,'C22.1'
+                    ,'C22.9'
+                    ,'C23'
+                    ,'C24.0'
+                    ,'C24.9'
+                    ,'C25.9'
+                    ,'C26.0'
+                    ,'C26.9'
+                    ]
+
+Pulmonary_Cancer  = ['C32.9'
+                    ,'C34.1'
+                    ,'C34.3'
+                    ,'C34.9'
+                    ]
+
+Renal_Cancer      = ['C64'
+                    ,'C67.9'
+                    ,'C76.2'
+                    ,'C78.6'
+                    ,'C78.7'
+                    ,'C79.8'
+                    ]
+
+Skeletal_Cancer   = ['C41.9']
+
+Skin_Cancer       = ['C43.5'
+                    ,'C43.7'
+                    ,'C43.9'
+                    ,'C44.4'
+                    ,'C44.9'
+                    ,'C45.9'
+                    ,'C48.2'
+                    ,'C76.0'
+                    ,'C76.2'
+                    ]
+
+Brain_Cancer      = ['C71.9'
+                    ,'D43.2'
+                    ]
+
+Thyroid_Cancer    = ['C73']
+
+
+Lymphatic_Cancer  = ['C81.9'
+                    ,'C83.1'
+                    ,'C83.3'
+                    ,'C85.1'
+                    ,'C85.9'
+                    ]
+
+Blood_Cancer      = ['C90.0'
+                    ,'C91.0'
+                    ,'C91.1'
+                    ,'C92.0'
+                    ,'C92.1'
+                    ,'C95.0'
+                    ,'C95.9'
+                    ,'D46.9'
+                    ,'D47.1'
+                    ]
+
+Female_Cancer     = ['C50.9'
+                    ,'C51.9'
+                    ,'C53.9'
+                    ,'C54.1'
+                    ,'C55'
+                    ,'C56'
+                    ]
+
+Male_Cancer       = ['C61']
+
+Misc_Cancer       = ['C80'
+                    ,'C97'
+                    ]
+# ---------- Cancer ---------- #
+
+
+# -------- Heart -------- #
+Valve        = ['I05.0'
+               ,'I05.9'
+               ,'I34.0'
+               ,'I35.0'
+               ,'I35.9'
+               ,'I38'
+               ]
+
+Hypertension = ['I10'
+               ,'I11.0'
+               ,'I11.9'
+               ,'I12.0'
+               ,'I13.1'
+               ,'I13.2'
+               ,'I27.0'
+               ,'I27.2'
+               ]
+
+MI          = ['I20.9'
+              ,'I21.4'
+              ,'I21.9'
+              ,'I24.9'
+              ,'I25.0'
+              ,'I25.1'
+              ,'I25.5'
+              ,'I25.8'
+              ,'I25.9'
+              ,'I26.9'
+              ,'I27.9'
+              ,'I33.0'
+              ,'I42.0'
+              ,'I42.2'
+              ,'I42.9'
+              ,'I46.9'
+              ]
+
+MI_Specific = ['I48'
+              ,'I49.9'
+              ,'I50.0'
+              ,'I50.9'
+              ,'I51.6'
+              ,'I51.7'
+              ,'I51.9'
+              ]
+
+Haemorrhage = ['I60.7'
+              ,'I60.9'
+              ,'I61.5'
+              ,'I61.9'
+              ,'I62.0'
+              ,'I62.9'
+              ]
+
+Circulatory = ['I70.0'
+              ,'I70.9'
+              ,'I71.0'
+              ,'I71.1'
+              ,'I71.2'
+              ,'I71.3'
+              ,'I71.4'
+              ,'I71.8'
+              ,'I71.9'
+              ,'I73.9'
+              ,'I80.2'
+              ,'I99'
+              ]
+# -------- Heart -------- #
+
+
+# ----- Brain ----- #
+Stroke = ['I63.3'
+         ,'I63.4'
+         ,'I63.5'
+         ,'I63.9'
+         ,'I64'
+         ,'I67.2'
+         ,'I67.8'
+         ,'I67.9'
+         ,'I69.3'
+         ,'I69.4'
+         ,'I69.8'
+         ]
+# ----- Brain ----- #
+
+
+# ---- Infections ---- #
+Flu        = ['J10.0'
+             ,'J10.1'
+             ,'J11.0'
+             ]
+
+Pneumonia  = ['J12.9'
+             ,'J15.2'
+             ,'J15.9'
+             ,'J18.0'
+             ,'J18.1'
+             ,'J18.9'
+             ]
+
+Bronchitis = ['J40'
+             ,'J42'
+             ,'J47'
+             ]
+# ---- Infections ---- #
+
+
+# -------- Disease -------- #
+Gastro          = ['A04.7'
+                  ,'A09.0'
+                  ,'A09.9'
+                  ,'A16.2'
+                  ,'A41.9'
+                  ]
+
+Hepatitis       = ['B16.9'
+                  ,'B17.1'
+                  ,'B18.2'
+                  ,'B94.2']
+
+HIV             = ['B20.1'
+                  ,'B20.3'
+                  ,'B20.6'
+                  ,'B20.7'
+                  ,'B20.8'
+                  ,'B21.2'
+                  ,'B22.2'
+                  ,'B23.8'
+                  ,'B24'
+                  ]
+
+Motor_Disease   = ['G12.2'
+                  ,'G20'
+                  ,'G23.1'
+                  ]
+
+Immune_Disease  = ['G35'
+                  ,'G40.9'
+                  ,'G70.0'
+                  ,'G80.9'
+                  ,'M32.1'
+                  ,
+                  ]
+
+Blood_And_Fluid = ['D64.9'
+                  ,'E78.0'
+                  ,'E78.5'
+                  ,'E86'
+                  ]
+
+Diabetes        = ['E10.2'
+                  ,'E10.9'
+                  ,'E11.2'
+                  ,'E11.5'
+                  ,'E11.7'
+                  ,'E11.9'
+                  ,'E14.0'
+                  ,'E14.1'
+                  ,'E14.2'
+                  ,'E14.5'
+                  ,'E14.7'
+                  ,'E14.9'
+                  ]
+
+Obesity         = ['E66.8'
+                  ,'E66.9'
+                  ]
+
+Protein         = ['E43'
+                  ,'E46'
+                  ]
+
+Thyroid         = ['E03.9']
+
+COPD            = ['J43.9'
+                  ,'J44.0'
+                  ,'J44.1'
+                  ,'J44.8'
+                  ,'J44.9'
+                  ,'J45.9'
+                  ]
+
+Pulmonary       = ['J69.0'
+                  ,'J84.1'
+                  ,'J84.9'
+                  ,'J98.4'
+                  ]
+# -------- Disease -------- #
+
+
+# --------- GI --------- #
+GI          = ['K25.4'
+              ,'K26.4'
+              ,'K26.5'
+              ,'K27.4'
+              ,'K52.9'
+              ,'K55.0'
+              ,'K55.9'
+              ,'K56.6'
+              ,'K57.8'
+              ,'K57.9'
+              ,'K63.1'
+              ,'K92.2'
+              ]
+
+Hepatic     = ['K76.0'
+              ,'K76.9'
+              ]
+
+Gallbladder = ['K80.2'
+              ,'K81.0'
+              ,'K81.9'
+              ,'K83.0'
+              ]
+
+Pancreas    = ['K85'
+              ,'K85.9'
+              ]
+
+Renal       = ['N03.9'
+              ,'N12'
+              ,'N17.9'
+              ,'N18.0'
+              ,'N18.4'
+              ,'N18.5'
+              ,'N18.9'
+              ,'N19'
+              ,'N39.0'
+              ]
+# --------- GI --------- #
+
+
+# ---- Joints ---- #
+Joints = ['M06.9'
+         ,'M19.9'
+         ]
+
+Osteo  = ['M80.9'
+         ,'M81.9'
+         ,'M86.9'
+         ]
+
+Skin   = ['M34.8']
+# ---- Joints ---- #
+
+
+# ---------- Age ---------- #
+Prebirth        = ['Q00.0'
+                  ,'Q04.2'
+                  ,'Q23.4'
+                  ,'Q24.9'
+                  ,'Q33.6'
+                  ,'Q79.0'
+                  ,'Q89.7'
+                  ,'Q90.9'
+                  ,'Q91.3'
+                  ,'Q91.7'
+                  ]
+
+Neonate_Disease = ['P01.0'
+                  ,'P01.1'
+                  ,'P01.5'
+                  ,'P02.1'
+                  ,'P02.7'
+                  ,'P07.2'
+                  ,'P07.3'
+                  ,'P21.9'
+                  ,'P22.0'
+                  ,'P27.1'
+                  ,'P28.0'
+                  ,'P29.0'
+                  ,'P29.1'
+                  ,'P36.9'
+                  ,'P52.3'
+                  ,'P77'
+                  ,'R95'
+                  ,'R99'
+                  ]
+
+Seniority       = ['G30.1'
+                  ,'G30.9'
+                  ,'G31.1'
+                  ,'G31.8'
+                  ,'G31.9'
+                  ,'R54'
+                  ,'R62.8'
+                  ,'R63.6'
+                  ,'R63.8'
+                  ]
+
+Dementia        = ['F01.1'
+                  ,'F01.9'
+                  ,'F03'
+                  ]
+
+
+# Mental
+Mental_Disorder = ['F06.9'
+                  ,'F10.0'
+                  ,'F10.1'
+                  ,'F10.2'
+                  ,'F11.9'
+                  ,'F14.9'
+                  ,'F15.1'
+                  ,'F19.1'
+                  ,'F19.9'
+                  ,'F50.8'
+                  ,'F79'
+                  ]
+
+Cerebral        = ['G80.9'
+                  ,'G93.4'
+                  ,'G93.9'
+                  ]
+# ---------- Age ---------- #
+
+
+# -- Gender Specific -- #
+Mens_Disease = ['N40']
+
+Child_birth  = ['O96']
+# -- Gender Specific -- #
+
+
+# Self-Inflicted Disease
+Alcoholism = ['K70.0'
+             ,'K70.1'
+             ,'K70.3'
+             ,'K70.4'
+             ,'K70.9'
+             ,'K74.6'
+             ]
+# Self-Inflicted Disease
+
+
+# --------------- Medical --------------- #
+
+# --------------- Trauma --------------- #
+
+# Motor-Vehicle Collision
+Pedestrian = ['V03.1'
+             ,'V09.2'
+             ,'V87.7'
+             ,'V89.2'
+             ]
+
+Motorcycle = ['V23.4'
+             ,'V27.4'
+             ]
+
+Car        = ['V43.5'
+             ,'V43.6'
+             ,'V47.5'
+             ,'V47.6'
+             ,'V48.5'
+             ,'Y85.0'
+             ]
+
+# Misc.
+Fall = ['W01'
+       ,'W06'
+       ,'W10'
+       ,'W18'
+       ]
+
+
+# Firearms
+Firarms            = ['W34']
+
+Airway_Obstruction = ['W67'
+                     ,'W79'
+                     ]
+
+Imolation          = ['X00']
+
+Poisoning          = ['X41'
+                     ,'X42'
+                     ,'X44'
+                     ,'X45'
+                     ,'X59'
+                     ,'X59.9'
+                     ]
+
+
+# Suicide
+Self_Harm        = ['X64'
+                   ,'X67'
+                   ,'X70'
+                   ,'X80'
+                   ]
+
+
+
+Self_Firearm     = ['X72'
+                   ,'X73'
+                   ,'X74'
+                   ]
+
+
+# Homicide
+
+Homicide_Firearm = ['X93'
+                   ,'X94'
+                   ,'X95'
+                   ,'Y35.0'
+                   ]
+
+Homicide_Object  = ['X99'
+                   ,'Y09'
+                   ]
+
+# Accidental
+Misc             = ['Y14']
+
+# --------------- Trauma --------------- #
+
+# --------------- Giant lists of Death Codes -------------------- #
@@ -0,0 +1,349 @@
+import numpy as np
+import pandas as pd
+
+from .codes import age_group_codes
+from .cleaning import compact_df
+from .storage import store_dir, load_df, clean_chunks, write_part, partition_files
+
+
+# The dataset is only read the first time something asks for it, and anything
+# worked out from it (the code dictionaries, the cube, the cause lists) is built the
+# first time it's needed and then kept until the data changes
+
+
+# The columns each spot in a choice list filters on
+dimensions = ['Year'
+             ,'State Code'
+             ,'County Code'
+             ,'Age Group Code'
+             ,'Cause of Death Code'
+             ]
+
+loaded     = {}
+
+# Goes up every time the data is swapped out, so anything cached against the
+# old data can tell it's stale
+generation = 0
+
+
+
+# Always the configured export (through its cache). A store only gets loaded
+# when it's asked for, e.g. set_df(load_store()) after append_export
+def get_df():
+
+    if 'df' not in loaded:
+        loaded['df'] = load_df()
+
+    return loaded['df']
+
+
+
+# Swaps in a different dataset, e.g. another export or one built by the
+# ingest functions, and throws away everything built from the old one
+def set_df(df):
+
+    global generation
+
+    loaded.clear()
+    loaded['df']  = df
+    generation   += 1
+
+
+
+def derived(name, build):
+
+    if name not in loaded:
+        loaded[name] = build(get_df())
+
+    return loaded[name]
+
+
+
+# ----- Dictionary Codes ----- #
+# Every filterable column gets a dictionary of its values, worked out once, and
+# every row gets the position of its value in there as a small integer. A choice
+# is turned into those integers once, and filtering is then a lookup into a
+# table of True/False per code instead of comparing codes and labels row by row.
+# Each dictionary also holds the label for every value, e.g. the county name
+# for a County Code, so it doubles as the code -> name lookup.
+# Missing values get -1, which lands on an extra False spot at the end of the
+# table, so they're never picked
+label_columns = {'Year':                None
+                ,'State Code':          'State'
+                ,'County Code':         'County'
+                ,'Age Group Code':      'Age Group'
+                ,'Cause of Death Code': 'Cause of Death'
+                }
+
+
+# Smallest signed integer that fits every code and the -1
+def code_dtype(size):
+    return np.min_scalar_type(-max(size, 1))
+
+
+
+def build_encoding(df):
+
+    encoding = {}
+
+    for column in dimensions:
+
+        codes, values = pd.factorize(df[column], sort = True)
+        values        = np.asarray(values)
+        label         = label_columns[column]
+
+        if label is None or label not in df:
+            labels = values
+        else:
+            # The label from the first row each value turns up in
+            found    = np.flatnonzero(codes >= 0)
+            _, first = np.unique(codes[found], return_index = True)
+            labels   = df[label].to_numpy()[found[first]]
+
+        encoding[column] = {'codes':      codes.astype(code_dtype(len(values)))
+                           ,'dictionary': pd.Series(labels
+                                                   ,index = pd.Index(values, name = column)
+                                                   ,name  = label or column)}
+
+    return encoding
+
+
+
+def code_mask(codes, positions, size):
+
+    table            = np.zeros(size + 1, dtype = bool)
+    table[positions] = True
+
+    return table[codes]
+# ----- Dictionary Codes ----- #
+
+
+
+# ----- Death Cube ----- #
+# Every row of df already sits on one (Year, State, County, Age Group, Cause)
+# combination, so summing Deaths over those five once gives a cube that all the
+# year-by-year graphs can be answered from without going back to df_filter
+def build_cube(df):
+    return df.groupby(dimensions, observed = True, sort = True)['Deaths'].sum()
+# ----- Death Cube ----- #
+
+
+
+def get_encoding():
+    return derived('encoding', build_encoding)
+
+
+# Value -> label for one column, e.g. get_dictionary('County Code')[6073]
+def get_dictionary(column):
+    return get_encoding()[column]['dictionary']
+
+
+def get_death_cube():
+    return derived('death_cube', build_cube)
+
+
+def get_causes():
+    return derived('causes', lambda df: df['Cause of Death'].unique().tolist())
+
+
+def get_causes_codes():
+    return derived('causes_codes', lambda df: df['Cause of Death Code'].unique().tolist())
+
+
+# Every cause code in sorted order, for looking up prefixes and ranges. The
+# code == code drops any missing codes, NaN never equals itself
+def get_cause_code_index():
+    return derived('cause_code_index'
+                  ,lambda df: np.array(sorted(str(code) for code in get_causes_codes() if code == code)))
+
+
+
+# Every row position of df in the order of one column, worked out once per
+# column and direction, for the sorted table pages. Text columns are sorted on
+# their labels. Ties keep their row order and missing values go last either way
+def build_sort_order(df, column, ascending = True):
+
+    values = df[column]
+
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        categories = values.cat.categories
+        rank       = np.argsort(np.argsort(categories.to_numpy(dtype = object).astype(str)))
+        if not ascending:
+            rank = len(categories) - 1 - rank
+        values     = np.append(rank, len(categories))[values.cat.codes.to_numpy()]
+    else:
+        values     = values.to_numpy()
+        if not ascending:
+            values = -values
+
+    return np.argsort(values, kind = 'stable')
+
+
+def get_sort_order(column, ascending = True):
+    return derived('sort ' + column + (' ascending' if ascending else ' descending')
+                  ,lambda df: build_sort_order(df, column, ascending))
+
+
+
+def distinct(column):
+    return derived('distinct ' + column
+                  ,lambda df: sorted(df[column].dropna().unique().tolist()))
+
+
+
+# The default values for ALL RESULTS, what a blank choice gets swapped for.
+# Years, states and counties are whatever is in the data
+def get_default():
+    return derived('default', lambda df: [distinct('Year')
+                                         ,distinct('State Code')
+                                         ,distinct('County Code')
+                                         ,age_group_codes
+                                         ,get_causes_codes()])
+
+
+
+# ----- Incremental Append ----- #
+# When a new year or state comes in, only the new rows get cleaned, encoded and
+# summed. They're stuck on the end of what's already loaded and folded into the
+# existing dictionaries and cube, everything else is left as it is
+
+
+# Categories have to be the same on both sides or concat falls back to plain
+# objects, so the new ones are added on the end (which keeps the existing codes)
+def concat_compact(old_df, new_df):
+
+    old_df = old_df.copy(deep = False)
+    new_df = new_df.copy(deep = False)
+
+    for column in old_df.columns:
+        if isinstance(old_df[column].dtype, pd.CategoricalDtype) and column in new_df:
+            categories     = old_df[column].cat.categories.append(
+                                 pd.Index(new_df[column].dropna().unique().tolist()).difference(old_df[column].cat.categories))
+            old_df[column] = old_df[column].cat.set_categories(categories)
+            new_df[column] = new_df[column].astype(pd.CategoricalDtype(categories))
+
+    return pd.concat([old_df, new_df], ignore_index = True)
+
+
+
+# Values the old dictionaries haven't seen go on the end, so the old codes all
+# stay as they were and only the new rows' codes need translating
+def merge_encoding(old_encoding, new_encoding):
+
+    merged = {}
+
+    for column, old_entry in old_encoding.items():
+
+        new_entry  = new_encoding[column]
+        added      = new_entry['dictionary'][~new_entry['dictionary'].index.isin(old_entry['dictionary'].index)]
+        dictionary = pd.concat([old_entry['dictionary'], added])
+
+        # Where each of the new dictionary's codes ends up, -1 staying -1
+        moved      = np.append(dictionary.index.get_indexer(new_entry['dictionary'].index), -1)
+        codes      = np.concatenate([old_entry['codes'], moved[new_entry['codes']]])
+
+        merged[column] = {'codes':      codes.astype(code_dtype(len(dictionary)))
+                         ,'dictionary': dictionary}
+
+    return merged
+
+
+
+# append_df never lets a partition in twice, so the two cubes never share a
+# combination and can just be put together
+def merge_cube(old_cube, new_cube):
+    return pd.concat([old_cube, new_cube]).sort_index()
+
+
+
+def merge_unique(old_values, new_values):
+
+    seen = set(old_values)
+
+    return old_values + [value for value in new_values if value not in seen and value == value]
+
+
+
+# The (State Code, Year) pairs a frame has rows for, the same split as the
+# store's partitions
+def partition_keys(df):
+    return pd.MultiIndex.from_frame(df[['State Code', 'Year']].astype('int64')).unique()
+
+
+
+# Appending a state and year that's already there would count every death in
+# it twice, so that's refused before anything is touched
+def check_new_partitions(keys, existing, where):
+
+    repeated = keys[keys.isin(existing)]
+
+    if len(repeated):
+        raise ValueError('already in {}: {}'.format(where
+                                                   ,', '.join('state {} year {}'.format(state, year)
+                                                              for state, year in repeated)))
+
+
+
+def append_df(new_df):
+
+    global generation
+
+    old_df   = get_df()
+    new_df   = compact_df(new_df)
+
+    check_new_partitions(partition_keys(new_df), partition_keys(old_df), 'the loaded data')
+
+    merged   = {'df': concat_compact(old_df, new_df)}
+
+    # Anything already built gets the new rows folded in, anything that hasn't
+    # been built yet (or is cheap to redo, like default) is left to be built
+    # from the merged data when it's next asked for
+    if 'encoding' in loaded:
+        merged['encoding'] = merge_encoding(loaded['encoding'], build_encoding(new_df))
+
+    if 'death_cube' in loaded:
+        merged['death_cube'] = merge_cube(loaded['death_cube'], build_cube(new_df))
+
+    for name, column in [['causes',       'Cause of Death']
+                        ,['causes_codes', 'Cause of Death Code']]:
+        if name in loaded:
+            merged[name] = merge_unique(loaded[name], new_df[column].unique().tolist())
+
+    for name in loaded:
+        if name.startswith('distinct '):
+            column       = name[len('distinct '):]
+            merged[name] = sorted(set(loaded[name]) | set(new_df[column].dropna().unique().tolist()))
+
+    loaded.clear()
+    loaded.update(merged)
+    generation += 1
+
+    return len(new_df)
+
+
+
+# Cleans a new CDC export a chunk at a time, writes it to the store as new part
+# files and appends it to the loaded data. The first append into an empty store
+# writes what's already loaded there too, so the store has everything and a
+# later session can pick it all back up with set_df(load_store()).
+# store = None only appends in memory, gone once the process ends
+def append_export(path, store = store_dir, chunk_size = 200000):
+
+    new_df = pd.concat(list(clean_chunks(path, chunk_size)), ignore_index = True)
+    keys   = partition_keys(new_df)
+
+    # Checked against both the loaded data and the store before either is
+    # written to, so a repeated export leaves everything as it was
+    check_new_partitions(keys, partition_keys(get_df()), 'the loaded data')
+
+    if store is not None:
+        stored = [(state, year) for state, year in keys if partition_files(store, [state], [year])]
+        check_new_partitions(keys, stored, store)
+
+        if not partition_files(store):
+            write_part(get_df(), store)
+
+        write_part(new_df, store)
+
+    return append_df(new_df)
+# ----- Incremental Append ----- #
@@ -0,0 +1,155 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from .dataset import dimensions
+from .query import store_choices, expand_cause_codes
+
+
+# ----- Memory Mapped Columns ----- #
+# Every column saved as its own plain .npy array, with the text columns saved as
+# their category codes and the category labels kept in schema.json. Loading them
+# with mmap_mode means the OS keeps one copy in memory no matter how many
+# worker processes open the same folder, and nothing is read until it's used.
+#
+# mapped_mask and mapped_sum work straight on the mapped arrays. mapped_df wraps
+# them as a dataframe for everything else, e.g. in each worker
+#   set_df(mapped_df(load_mapped()))
+# The number columns stay shared there, pandas makes its own copy of the
+# category codes (one or two bytes a row)
+
+mapped_dir = os.path.join('data', 'mapped')
+
+
+def write_mapped(df, folder = mapped_dir):
+
+    os.makedirs(folder, exist_ok = True)
+
+    schema = {}
+
+    for column in df.columns:
+
+        file_name = column + '.npy'
+        values    = df[column]
+
+        # Python objects can't be memory mapped, so any other text column is
+        # saved as categories too
+        if not isinstance(values.dtype, pd.CategoricalDtype) and values.to_numpy().dtype.hasobject:
+            values = values.astype('category')
+
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(folder, file_name), values.cat.codes.to_numpy())
+            schema[column] = {'file':       file_name
+                             ,'categories': values.cat.categories.tolist()}
+        else:
+            np.save(os.path.join(folder, file_name), values.to_numpy())
+            schema[column] = {'file': file_name}
+
+    # The schema goes last, so a reader never picks up a half written folder
+    with open(os.path.join(folder, 'schema.json.tmp'), 'w') as file:
+        json.dump(schema, file)
+
+    os.replace(os.path.join(folder, 'schema.json.tmp'), os.path.join(folder, 'schema.json'))
+
+    return folder
+
+
+
+def load_mapped(folder = mapped_dir):
+
+    with open(os.path.join(folder, 'schema.json')) as file:
+        schema = json.load(file)
+
+    mapped = {}
+
+    for column, entry in schema.items():
+        mapped[column] = {'values':     np.load(os.path.join(folder, entry['file']), mmap_mode = 'r')
+                         ,'categories': pd.Index(entry['categories']) if 'categories' in entry else None}
+
+    return mapped
+
+
+
+def mapped_df(mapped):
+
+    columns = {}
+
+    for column, entry in mapped.items():
+        if entry['categories'] is None:
+            columns[column] = entry['values']
+        else:
+            columns[column] = pd.Categorical.from_codes(entry['values'], entry['categories'])
+
+    return pd.DataFrame(columns, copy = False)
+
+
+
+# The chosen values as the numbers actually stored in the column. For the text
+# columns that's their category codes, values not in the data just drop out
+def mapped_values(mapped, column, choice):
+
+    entry = mapped[column]
+
+    if entry['categories'] is None:
+        return np.asarray(list(choice))
+
+    if column == 'Cause of Death Code':
+        choice = expand_cause_codes(choice, np.array(sorted(entry['categories'])))
+
+    positions = entry['categories'].get_indexer(list(choice))
+
+    return positions[positions >= 0]
+
+
+
+# Same choices as df_filter, blanks meaning everything. Each chosen column is
+# checked in place on the mapped array, None means every row is kept
+def mapped_mask(mapped, choices):
+
+    keep = None
+
+    for column, choice in zip(dimensions, store_choices(choices)):
+        if choice is None:
+            continue
+
+        mask = np.isin(mapped[column]['values'], mapped_values(mapped, column, choice))
+
+        if keep is None:
+            keep  = mask
+        else:
+            keep &= mask
+
+    return keep
+
+
+
+# Sum of value for every distinct value of by, over the chosen rows
+def mapped_sum(mapped, choices, by = 'Year', value = 'Deaths'):
+
+    keep   = mapped_mask(mapped, choices)
+    keys   = mapped[by]['values']
+    values = mapped[value]['values']
+
+    if keep is not None:
+        keys   = keys[keep]
+        values = values[keep]
+
+    # Missing text values are stored as -1, they're left out the same as a
+    # group-by would
+    if mapped[by]['categories'] is not None:
+        present = keys >= 0
+        keys    = keys[present]
+        values  = values[present]
+
+    uniques, positions = np.unique(keys, return_inverse = True)
+    sums               = np.bincount(positions, weights = values, minlength = len(uniques))
+
+    if np.issubdtype(values.dtype, np.integer):
+        sums = sums.astype('int64')
+
+    if mapped[by]['categories'] is not None:
+        uniques = mapped[by]['categories'].take(uniques)
+
+    return pd.Series(sums, index = pd.Index(uniques, name = by), name = value)
+# ----- Memory Mapped Columns ----- #
@@ -0,0 +1,256 @@
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.path import Path
+from matplotlib.patches import PathPatch
+from matplotlib.collections import PatchCollection
+from matplotlib.animation import FuncAnimation, PillowWriter, FFMpegWriter
+
+from .storage import cache_dir, file_hash
+from .query import map_values, map_matrix
+
+
+# ---------- County Map Plot ---------- #
+# Choropleth maps of the counties or states, joined to the data on County Code.
+# Reading and reprojecting a boundary shapefile is by far the slowest part of
+# drawing a map, so it's only ever done once per boundary file: the shapes get
+# projected, simplified and flattened into plain arrays of outline points,
+# which are cached as an .npz next to the parquet cache. After that geopandas
+# isn't needed at all, and a redraw is just a new value per county handed to
+# the shapes that are already on the figure.
+#
+# Uses the Census cartographic boundary counties by default, e.g.
+# cb_2018_us_county_500k.shp, which keys every county on GEOID (state and
+# county FIPS, the same number as County Code)
+#
+#   fig = plot_map([2016, '', '', '', ''], 'Crude Rate', states = [6])
+#
+# animate_map below does the same for every year as a time slider
+
+boundary_path = os.environ.get('CDC_COUNTY_BOUNDARIES'
+                              ,os.path.join('data', 'boundaries', 'cb_2018_us_county_500k.shp'))
+
+# Conus Albers, an equal area projection so big counties don't get drawn
+# bigger than they are. Tolerance is in its units, metres
+map_crs       = 'EPSG:5070'
+map_tolerance = 500
+
+loaded_shapes = {}
+
+
+
+def boundary_cache_path(path, tolerance):
+
+    key  = file_hash(path)[:16] + '_' + str(tolerance)
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    return os.path.join(cache_dir, name + ' ' + key + '.npz')
+
+
+
+# Every ring of every polygon as one run of points, one shape's rings after
+# another, with offsets marking where each shape's points start and end
+def shape_arrays(shapes, column, prefix):
+
+    vertices = []
+    codes    = []
+    offsets  = [0]
+
+    for geometry in shapes.geometry:
+
+        polygons = geometry.geoms if geometry.geom_type == 'MultiPolygon' else [geometry]
+        count    = offsets[-1]
+
+        for polygon in polygons:
+            for ring in [polygon.exterior] + list(polygon.interiors):
+
+                points         = np.asarray(ring.coords)[:, :2]
+                ring_codes     = np.full(len(points), Path.LINETO, dtype = np.uint8)
+                ring_codes[0]  = Path.MOVETO
+                ring_codes[-1] = Path.CLOSEPOLY
+
+                vertices.append(points)
+                codes.append(ring_codes)
+                count += len(points)
+
+        offsets.append(count)
+
+    return {prefix + ' codes':    shapes[column].to_numpy(dtype = 'int64')
+           ,prefix + ' states':   shapes['State Code'].to_numpy(dtype = 'int64')
+           ,prefix + ' vertices': np.concatenate(vertices).astype('float32')
+           ,prefix + ' paths':    np.concatenate(codes)
+           ,prefix + ' offsets':  np.array(offsets, dtype = 'int64')}
+
+
+
+# The one slow step. geopandas only gets imported here, so nothing else in
+# the package needs it installed once the cache exists
+def build_boundaries(path, tolerance):
+
+    import geopandas
+
+    counties = geopandas.read_file(path).to_crs(map_crs)
+    counties['County Code'] = counties['GEOID'].astype('int64')
+    counties['State Code']  = counties['STATEFP'].astype('int64')
+    counties = counties[['County Code', 'State Code', 'geometry']]
+
+    # States are the counties merged, before simplifying so they share edges
+    states   = counties.dissolve('State Code', as_index = False)
+
+    counties['geometry'] = counties.simplify(tolerance)
+    states['geometry']   = states.simplify(tolerance)
+
+    arrays = {}
+    arrays.update(shape_arrays(counties, 'County Code', 'County Code'))
+    arrays.update(shape_arrays(states,   'State Code',  'State Code'))
+
+    return arrays
+
+
+
+def load_boundaries(path = boundary_path, tolerance = map_tolerance):
+
+    key = (path, tolerance)
+
+    if key in loaded_shapes:
+        return loaded_shapes[key]
+
+    cached = boundary_cache_path(path, tolerance)
+
+    if os.path.exists(cached):
+        with np.load(cached) as file:
+            arrays = dict(file)
+    else:
+        arrays = build_boundaries(path, tolerance)
+
+        # Written to a temp file first so a crash never leaves a half cache
+        os.makedirs(cache_dir, exist_ok = True)
+        with open(cached + '.tmp', 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(cached + '.tmp', cached)
+
+    loaded_shapes[key] = arrays
+
+    return arrays
+
+
+
+# The codes and outlines of every county (or state) in states, None for all
+def shape_paths(level = 'County Code', states = None, path = boundary_path, tolerance = map_tolerance):
+
+    arrays  = load_boundaries(path, tolerance)
+    codes   = arrays[level + ' codes']
+    offsets = arrays[level + ' offsets']
+    keep    = np.arange(len(codes))
+
+    if states is not None:
+        keep = np.flatnonzero(np.isin(arrays[level + ' states'], list(states)))
+
+    paths = [Path(arrays[level + ' vertices'][offsets[shape]:offsets[shape + 1]]
+                 ,arrays[level + ' paths'][offsets[shape]:offsets[shape + 1]])
+             for shape in keep]
+
+    return codes[keep], paths
+
+
+
+# Draws the outlines once with no values in them yet. Hands back the figure,
+# the collection of shapes and the code of each shape, in order, for
+# update_map to fill in
+def draw_map(level = 'County Code', states = None, cmap = 'Reds', path = boundary_path, tolerance = map_tolerance):
+
+    codes, paths = shape_paths(level, states, path, tolerance)
+
+    fig, ax      = plt.subplots(figsize = (10, 10))
+    collection   = PatchCollection([PathPatch(shape) for shape in paths]
+                                  ,cmap      = cmap
+                                  ,edgecolor = 'white'
+                                  ,linewidth = 0.3)
+    collection.set_array(np.ma.masked_all(len(codes)))
+
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    ax.set_aspect('equal')
+    ax.axis('off')
+    fig.colorbar(collection, ax = ax, shrink = 0.6)
+
+    return fig, collection, codes
+
+
+
+# Lines values (indexed by County Code or State Code) up with the shapes. Places
+# with no value are left blank rather than drawn as 0. limits fixes the colour
+# scale, e.g. so every year of a slider uses the same one
+def update_map(collection, codes, values, limits = None):
+
+    vector = values.reindex(codes).to_numpy(dtype = 'float64')
+
+    collection.set_array(np.ma.masked_invalid(vector))
+
+    if limits is None:
+        collection.autoscale()
+    else:
+        collection.set_clim(*limits)
+
+    return collection
+
+
+
+def plot_map(choices, value = 'Deaths', level = 'County Code', states = None, title = None):
+
+    fig, collection, codes = draw_map(level, states)
+
+    update_map(collection, codes, map_values(choices, value, level))
+
+    plt.title(title or value, fontsize = 18)
+
+    return fig
+# ---------- County Map Plot ---------- #
+
+
+
+# ---------- Time Slider ---------- #
+# The map for every chosen year, as an animation. The whole year x county
+# table comes out of one map_matrix and is lined up with the shapes once, the
+# outlines are drawn once, and each frame just swaps in that year's row of
+# colours. The colour scale is fixed across all the years so they can be
+# compared. path decides the output:
+#   'deaths.gif' -> GIF through Pillow
+#   'deaths.mp4' -> MP4 through a local ffmpeg
+#   'deaths'     -> a folder with one png per year
+#
+#   animate_map(['', 6, '', '', ''], 'california.gif', 'Crude Rate', states = [6])
+
+def animate_map(choices, path, value = 'Deaths', level = 'County Code', states = None, fps = 2, title = None):
+
+    matrix                 = map_matrix(choices, value, level)
+    fig, collection, codes = draw_map(level, states)
+
+    years  = matrix.index.tolist()
+    frames = matrix.reindex(columns = codes).to_numpy(dtype = 'float64')
+    label  = plt.title('', fontsize = 18)
+
+    collection.set_clim(np.nanmin(frames), np.nanmax(frames))
+
+    def draw_frame(frame):
+        collection.set_array(np.ma.masked_invalid(frames[frame]))
+        label.set_text('{} {}'.format(title or value, years[frame]))
+        return collection, label
+
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == '':
+        os.makedirs(path, exist_ok = True)
+        for frame in range(len(years)):
+            draw_frame(frame)
+            fig.savefig(os.path.join(path, '{}.png'.format(years[frame])), bbox_inches = 'tight')
+
+    else:
+        writer    = PillowWriter(fps = fps) if extension == '.gif' else FFMpegWriter(fps = fps)
+        animation = FuncAnimation(fig, draw_frame, frames = len(years), blit = False)
+        animation.save(path, writer = writer)
+
+    plt.close(fig)
+
+    return path
+# ---------- Time Slider ---------- #
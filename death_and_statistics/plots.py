@@ -0,0 +1,301 @@
+import os
+import re
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+from textwrap import fill
+from concurrent.futures import ProcessPoolExecutor
+
+from .query import error_prev, df_filter, df_graphing_layers, donut_data, donut_table, donut_rings
+from .dataset import dimensions, get_dictionary
+
+
+# All the plotting lives here so importing the package never pulls in
+# matplotlib. Each function draws one figure and hands it back, showing or
+# saving it is up to whoever called it
+
+
+# This is for telling the pct values in the donut chart how to present
+def make_autopct(values):
+    def my_autopct(pct):
+        total = sum(values)
+        val = int(round(pct*total/100.0))
+        return '{v:d} ({p:.2f}%)'.format(p = pct
+                                         ,v = val)
+    return my_autopct
+
+
+
+# ----- Graph of Summed Deaths ----- #
+# For each year, add up the deaths for every value in one of the choices, e.g.
+# layer = 3 for a line per Age Group Code, layer = 4 for a line per cause
+def plot_yearly(choice, layer):
+
+    choice      = error_prev(choice)
+    labels      = get_dictionary(dimensions[layer])
+
+    fig, ax     = plt.subplots()
+    plotting_df = df_graphing_layers(choice, layer)
+
+    for column in plotting_df.columns:
+
+        ax.plot(plotting_df.index
+               ,plotting_df[column]
+               ,label = labels.get(column, column))
+
+
+    plt.xticks(rotation = 45)
+    plt.xlim(choice[0][0]
+            ,choice[0][-1])
+    plt.ylim(-0.5)
+    # Limited the y-axis to prevent the data from being all over the place
+
+
+    plt.title(str(get_dictionary('County Code')[choice[2][0]])
+        ,fontsize = 12
+        )
+
+    ax.legend(bbox_to_anchor = (1, 1))
+
+    return fig
+# ----- Graph of Summed Deaths ----- #
+
+
+
+# ---------- Donut Plot ---------- #
+def donut_title(county, years, age):
+
+    if len(years) == 1:
+        return (str(county) +
+                ' ' +
+                str(years[0]) +
+                '\n' +
+                'Ages ' +
+                age +
+                ' years')
+
+    return (str(county) +
+            ' ' +
+            str(years[0]) +
+            ' - ' +
+            str(years[-1]) +
+            '\n' +
+            'Ages ' +
+            age +
+            ' years')
+
+
+
+def plot_donut(choice):
+
+    choice           = error_prev(choice)
+    county_code_dict = get_dictionary('County Code')
+
+    return draw_donut(donut_data(choice)
+                     ,donut_title(county_code_dict[choice[2][0]], choice[0], choice[3][0])
+                     ,get_dictionary('Cause of Death Code'))
+
+
+
+# rings is what donut_data gives back, cause_code_dict only has to hold the
+# causes that are actually in it
+def draw_donut(rings, title, cause_code_dict):
+
+    group_names, group_size, subgroup_names, subgroup_size = rings
+
+    # Create colors
+    a, d = [plt.cm.Greens, plt.cm.Reds]
+
+    fig, ax = plt.subplots()
+    ax.axis('equal')
+    mpl.rcParams['font.size'] = 9.0
+
+
+    # First Ring (Outside), left off when there's no population to compare
+    # against, i.e. only age not stated was chosen
+    if group_size:
+        ring, text, perc    = ax.pie(group_size
+                                    ,radius        = 1.5
+                                    ,startangle    = 320
+                                    ,labels        = group_names
+                                    ,labeldistance = 1.1
+                                    ,autopct       = make_autopct(group_size)
+                                    ,pctdistance   = 0.87
+                                    ,colors        = [a(0.6)
+                                                     ,d(0.6)
+                                                     ]
+                                    )
+        # Sets the text size for the different groups and their percentages
+        text[0].set_fontsize(18)
+        text[1].set_fontsize(18)
+
+        perc[0].set_fontsize(12)
+        perc[1].set_fontsize(12)
+        perc[0].set_fontweight('bold')
+        perc[1].set_fontweight('bold')
+
+        plt.setp(ring
+                ,width = 0.4
+                ,edgecolor = 'white')
+
+
+    # Second Ring (Inside)
+    ring2, text2, perc2 = ax.pie(subgroup_size
+                                ,radius        = 1.5 - 0.4
+                                ,labels        = subgroup_names
+                                ,rotatelabels  = True
+                                ,counterclock  = False
+                                ,labeldistance = 0.8
+                                ,autopct       = make_autopct(subgroup_size)
+                                ,pctdistance   = 0.45
+                                ,colors        = [d(0.9)
+                                                 ,d(0.8)
+                                                 ,d(0.7)
+                                                 ,d(0.6)
+                                                 ,d(0.5)
+                                                 ,d(0.4)
+                                                 ]
+                                )
+
+    # perc2[0].set_fontweight('bold')
+    # perc2[1].set_fontweight('bold')
+
+    plt.setp(ring2
+            ,width = 0.4
+            ,edgecolor = 'white'
+            )
+
+    plt.setp(text2
+            ,rotation_mode = 'anchor'
+            ,ha            = 'center'
+            ,va            = 'center')
+
+
+    # An additional step that rotates the inner text to go around the ring for
+    # better legibility
+    for txt in text2:
+        rotation = txt.get_rotation()
+        txt.set_rotation(rotation + 90 + (1 - rotation // 180) * 180)
+
+    for number in range(0, len(subgroup_size), 1):
+        text2[number].set_fontsize(13)
+        perc2[number].set_fontsize(10)
+
+
+    # Printing the title
+    plt.title(title
+             ,fontsize = 18
+             ,y = 1.12)
+
+
+    # Printing the legend
+    legend_list = []
+
+    for thing in subgroup_names:
+        if re.match('[0-9]+ others\ncombined', thing):
+            continue
+        legend_list.append(fill(str(thing) + ': ' + str(cause_code_dict[thing])
+                               ,width = 50))
+
+    plt.legend(ring2
+              ,legend_list
+              ,bbox_to_anchor = (0.9, 1))
+
+    return fig
+# ---------- Donut Plot ---------- #
+
+
+
+# ---------- Batch Donuts ---------- #
+# A donut for every county, year and age group in the choices, saved as image
+# files. All the numbers come out of one donut_table up front, so each worker
+# process only gets handed the few values its charts need and just draws.
+# Workers draw with Agg, which never opens a window
+#
+#   render_donuts('donuts', ['', 6, '', '', ''])
+
+def use_agg():
+    plt.switch_backend('Agg')
+
+
+
+def render_donut(task):
+
+    path, rings, title, cause_code_dict = task
+
+    fig = draw_donut(rings, title, cause_code_dict)
+    fig.savefig(path, bbox_inches = 'tight')
+    plt.close(fig)
+
+    return path
+
+
+
+def donut_tasks(folder, choices, n, image_format):
+
+    table            = donut_table(df_filter(choices), n)
+    cause_code_dict  = get_dictionary('Cause of Death Code')
+    county_code_dict = get_dictionary('County Code')
+    tasks            = []
+
+    for (year, state, county, age), row in zip(table.index, table.to_numpy().tolist()):
+
+        rings = donut_rings(*row)
+
+        tasks.append([os.path.join(folder, '{}_{}_{}.{}'.format(county, year, age, image_format))
+                     ,rings
+                     ,donut_title(county_code_dict[county], [year], age)
+                     ,{cause: cause_code_dict[cause] for cause in rings[2] if cause in cause_code_dict}])
+
+    return tasks
+
+
+
+def render_donuts(folder, choices = ['', '', '', '', ''], n = 5, workers = None, image_format = 'png'):
+
+    os.makedirs(folder, exist_ok = True)
+
+    tasks = donut_tasks(folder, list(choices), n, image_format)
+
+    # Plenty of charts go to each worker at a time, so it's not waiting on the
+    # pool between every one
+    chunk_size = max(1, len(tasks) // (4 * (workers or os.cpu_count() or 1)))
+
+    with ProcessPoolExecutor(max_workers = workers, initializer = use_agg) as pool:
+        return list(pool.map(render_donut, tasks, chunksize = chunk_size))
+# ---------- Batch Donuts ---------- #
+
+
+
+# ---------- Scatter Plot ---------- #
+def plot_scatter(choice, title):
+
+    filtered_df = df_filter(choice)
+
+    target   = 'Deaths'
+    features = filtered_df.columns.drop(['Deaths'
+                                        ,'Year'
+                                        ,'Cause of Death'
+                                        ,'State'
+                                        ,'State Code'
+                                        ,'County Code'
+                                        ,'Age Group'
+                                        ,'Age Group Code'
+                                        ,'Population'
+                                        ,'Cause of Death Code'
+                                        ,'Crude Rate'
+                                        ,'Crude Rate Standard Error'])
+
+    fig = plt.figure(figsize = (20, 10))
+    for feature in features:
+        plt.scatter(x = feature
+                   ,y = target
+                   ,data = filtered_df
+                   ,alpha = 0.1)
+    plt.xticks(rotation = 90)
+    plt.xlim(-1, 53)
+    plt.ylim(0, 3500)
+
+    plt.title(title)
+
+    return fig
+# ---------- Scatter Plot ---------- #
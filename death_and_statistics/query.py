@@ -0,0 +1,632 @@
+import re
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+
+from . import dataset
+from .dataset import (dimensions, get_df, get_encoding, get_dictionary, get_death_cube, get_default
+                     ,get_cause_code_index, get_sort_order, code_mask)
+from .taxonomy import cause_group_column
+from .storage import store_dir, read_partitions
+
+
+# I need a way to filter based on arbitrary stats, e.g. County, Age Group, etc.
+
+
+# This prevents errors in the other functions for not passing a list
+# Just makes it simpler for me
+def error_prev(some_list):
+
+    # Converts any none lists into lists for use, and swaps blank values for
+    # the default. Ranges function identically to lists for my purposes
+    for position, choice in enumerate(some_list):
+
+        if type(choice) != list and type(choice) != range:
+            choice = [choice]
+
+        if len(choice) > 0 and choice[0] == '':
+            choice = get_default()[position]
+
+        some_list[position] = choice
+
+
+    # Cause codes can also be picked by prefix or range, e.g. 'I2*' or 'C00-C97'
+    some_list[4] = expand_cause_codes(some_list[4])
+
+
+    return some_list
+
+
+
+# ----- Cause Code Ranges ----- #
+# Prefixes and ranges get looked up with a binary search in the sorted list of
+# every cause code in the data, so 'C00-C97' is two searches and a slice rather
+# than checking every code against a pattern. A range takes in everything under
+# its end code too, so 'C00-C97' includes C97.1 and so on
+code_range_regex = r'^\s*([A-Z][0-9]{2}(?:\.[0-9]+)?)\s*[-\u2013]\s*([A-Z][0-9]{2}(?:\.[0-9]+)?)\s*$'
+
+# Sorts after anything that can follow a code, so searching for code + this
+# lands just past everything starting with that code
+after_code       = '\uffff'
+
+
+def code_span(choice):
+
+    if type(choice) != str:
+        return None
+
+    if choice.endswith('*'):
+        return choice[:-1], choice[:-1] + after_code
+
+    match = re.match(code_range_regex, choice)
+
+    if match:
+        return match.group(1), match.group(2) + after_code
+
+    return None
+
+
+
+# codes is the sorted list to search, the loaded dataset's if not given
+def expand_cause_codes(choice, codes = None):
+
+    spans = [code_span(code) for code in choice]
+
+    # Nothing to expand, which is most of the time, so leave it as it was
+    if all(span is None for span in spans):
+        return choice
+
+    if codes is None:
+        codes = get_cause_code_index()
+
+    expanded = []
+
+    for code, span in zip(choice, spans):
+
+        if span is None:
+            expanded.append(code)
+            continue
+
+        start, end = np.searchsorted(codes, span)
+        expanded  += codes[start:end].tolist()
+
+    return list(dict.fromkeys(expanded))
+# ----- Cause Code Ranges ----- #
+
+
+
+# ----- Dictionary Codes ----- #
+# The chosen values as positions in the column's dictionary, values that aren't
+# in the data just drop out
+def choice_codes(column, choice):
+
+    positions = get_dictionary(column).index.get_indexer(list(choice))
+
+    return positions[positions >= 0]
+
+
+
+def selection_mask(column, positions):
+    return code_mask(get_encoding()[column]['codes'], positions, len(get_dictionary(column)))
+
+
+
+# A choice that covers every value actually in the data keeps every row, so
+# there's no point masking on it. Catches blanks swapped for the default,
+# the default ranges themselves, and hand written lists of everything
+def selects_all(column, positions):
+
+    size = len(get_dictionary(column))
+
+    return len(positions) >= size and len(np.unique(positions)) == size
+
+
+
+# Gives the row positions to keep (None if that's every row) along with the
+# columns that actually had to be filtered on
+def filter_rows(choices):
+
+    choices = error_prev(choices)
+    keep    = None
+    applied = []
+
+    for column, choice in zip(dimensions, choices):
+
+        positions = choice_codes(column, choice)
+
+        if selects_all(column, positions):
+            continue
+
+        applied.append(column)
+
+        if keep is None:
+            keep  = selection_mask(column, positions)
+        else:
+            keep &= selection_mask(column, positions)
+
+    if keep is None:
+        return None, applied
+
+    return np.flatnonzero(keep), applied
+
+
+
+# The rows as a frame of their own, so changing it never touches df or the
+# cached rows
+def filter_frame(rows, applied):
+
+    if rows is None:
+        filtered_df = get_df().copy(deep = False)
+    else:
+        filtered_df = get_df().iloc[rows]
+
+    # So I can check what a query actually ended up filtering on
+    filtered_df.attrs['filters applied'] = list(applied)
+
+    return filtered_df
+
+
+def compute_filter(choices):
+    return filter_frame(*filter_rows(choices))
+# ----- Dictionary Codes ----- #
+
+
+
+# ----- Death Cube ----- #
+# Same idea as df_filter, just against the cube's index so it's one pass over
+# already summed values instead of five passes over df. The index keeps its
+# own integer codes per level, so the choices get turned into those
+def cube_slice(choices):
+
+    choices    = error_prev(choices)
+    death_cube = get_death_cube()
+    keep       = None
+
+    for level, choice in enumerate(choices):
+        if selects_all(dimensions[level], choice_codes(dimensions[level], choice)):
+            continue
+
+        values    = death_cube.index.levels[level]
+        positions = values.get_indexer(list(choice))
+        mask      = code_mask(death_cube.index.codes[level], positions[positions >= 0], len(values))
+
+        if keep is None:
+            keep  = mask
+        else:
+            keep &= mask
+
+    if keep is None:
+        return death_cube
+
+    return death_cube[keep]
+
+
+
+# This function is specifically for making a graph that projects data across
+# the years
+def compute_graphing(choices):
+
+    choices            = error_prev(choices)
+
+    # Summing by year in one go prevents the graph from having dozens of lines
+    # that zig-zag everywhere. Years with no deaths still need to show up as 0
+    death_sums_by_year = cube_slice(choices).groupby(level = 'Year').sum()
+    death_sums_by_year = death_sums_by_year.reindex(list(choices[0]), fill_value = 0)
+
+    plotting_df = pd.DataFrame({'Year':   death_sums_by_year.index.values
+                               ,'Deaths': death_sums_by_year.values})
+
+    return plotting_df
+
+
+
+# Same as df_graphing but for every value of one of the choices at once, e.g.
+# layer = 3 gives a Year x Age Group Code table with one column per line to plot
+def compute_graphing_layers(choices, layer):
+
+    choices = error_prev(choices)
+    level   = dimensions[layer]
+    layers  = list(dict.fromkeys(choices[layer]))
+
+    plotting_df = cube_slice(choices).groupby(level = ['Year', level]).sum()
+    plotting_df = plotting_df.unstack(level, fill_value = 0)
+    plotting_df = plotting_df.reindex(index   = list(choices[0])
+                                     ,columns = layers
+                                     ,fill_value = 0)
+
+    return plotting_df
+
+
+
+# Deaths per cause group per year, e.g. level = 'Category' for Medical vs
+# Trauma or 'Group' for Cancer vs Heart vs Homicide. Each cause in the slice
+# gets its group from the taxonomy and it's all summed in a single group-by,
+# instead of a df_graphing per code. geography splits it further by
+# 'State Code' or 'County Code', None adds everything together
+def compute_group_totals(choices, level = 'Group', geography = None):
+
+    choices = error_prev(choices)
+    sliced  = cube_slice(choices)
+    causes  = sliced.index.get_level_values('Cause of Death Code')
+    groups  = cause_group_column(pd.Series(causes), level).to_numpy()
+
+    keys    = [sliced.index.get_level_values('Year')]
+    if geography is not None:
+        keys.append(sliced.index.get_level_values(geography))
+
+    group_totals = sliced.groupby(keys + [groups], observed = True).sum()
+    group_totals = group_totals.unstack(-1, fill_value = 0)
+    group_totals.columns.name = level
+
+    return group_totals
+# ----- Death Cube ----- #
+
+
+
+# ----- Query Cache ----- #
+# I keep re-running the same choices while poking around, so the results get
+# kept keyed on the choices after error_prev (a blank and the default end up as
+# the same key). The key also carries the dataset generation, so nothing from
+# before a set_df is ever handed back. The oldest unused results get dropped
+# once it's full.
+# df_filter only keeps the row positions, a few bytes a row instead of a copy
+# of every column, and builds a new frame from them on every call. The other
+# results are small and shared with the cache, so copy them before changing them
+query_cache_size = 256
+
+
+def query_key(choices):
+    return (dataset.generation
+           ,tuple(tuple(choice) for choice in error_prev(choices)))
+
+
+
+@lru_cache(maxsize = query_cache_size)
+def cached_filter_rows(key):
+    return filter_rows([list(choice) for choice in key[1]])
+
+
+@lru_cache(maxsize = query_cache_size)
+def cached_graphing(key):
+    return compute_graphing([list(choice) for choice in key[1]])
+
+
+@lru_cache(maxsize = query_cache_size)
+def cached_graphing_layers(key, layer):
+    return compute_graphing_layers([list(choice) for choice in key[1]], layer)
+
+
+@lru_cache(maxsize = query_cache_size)
+def cached_group_totals(key, level, geography):
+    return compute_group_totals([list(choice) for choice in key[1]], level, geography)
+
+
+@lru_cache(maxsize = query_cache_size)
+def cached_table_rows(key, sort_by, ascending):
+    return compute_table_rows([list(choice) for choice in key[1]], sort_by, ascending)
+
+
+
+def df_filter(choices):
+    return filter_frame(*cached_filter_rows(query_key(choices)))
+
+
+def df_graphing(choices):
+    return cached_graphing(query_key(choices))
+
+
+def df_graphing_layers(choices, layer):
+    return cached_graphing_layers(query_key(choices), layer)
+
+
+def df_group_totals(choices, level = 'Group', geography = None):
+    return cached_group_totals(query_key(choices), level, geography)
+
+
+
+# Hits, misses and current size of each cache
+def query_cache_info():
+    return {'df_filter':          cached_filter_rows.cache_info()
+           ,'df_graphing':        cached_graphing.cache_info()
+           ,'df_graphing_layers': cached_graphing_layers.cache_info()
+           ,'df_group_totals':    cached_group_totals.cache_info()
+           ,'df_table':           cached_table_rows.cache_info()
+           }
+
+
+# Old results can't be hit once the data changes, this just frees them early
+def clear_query_cache():
+    cached_filter_rows.cache_clear()
+    cached_graphing.cache_clear()
+    cached_graphing_layers.cache_clear()
+    cached_group_totals.cache_clear()
+    cached_table_rows.cache_clear()
+# ----- Query Cache ----- #
+
+
+
+# ----- Table Pages ----- #
+# The filtered rows a page at a time, sorted on any column. Each column's sort
+# order over the whole of df is worked out once (get_sort_order), so sorting a
+# query is just keeping the filtered rows out of that order, no sort at all.
+# The sorted rows of a query are kept in the query cache, so clicking through
+# the pages only ever cuts out the rows of the page asked for
+def compute_table_rows(choices, sort_by = None, ascending = True):
+
+    rows, _ = filter_rows(choices)
+
+    if sort_by is None:
+        return np.arange(len(get_df())) if rows is None else rows
+
+    order = get_sort_order(sort_by, ascending)
+
+    if rows is None:
+        return order
+
+    keep       = np.zeros(len(get_df()), dtype = bool)
+    keep[rows] = True
+
+    return order[keep[order]]
+
+
+
+# True or False, or 'true' / 'false' as text from a URL or a form. Anything
+# else is an error rather than a guess, bool('false') would be True
+def sort_direction(ascending):
+
+    if isinstance(ascending, (bool, np.bool_)):
+        return bool(ascending)
+
+    if isinstance(ascending, str) and ascending.lower() in ('true', 'false'):
+        return ascending.lower() == 'true'
+
+    raise ValueError('ascending has to be true or false, not {!r}'.format(ascending))
+
+
+
+# Gives back the page of rows and how many rows the whole query has
+def df_table(choices, sort_by = None, ascending = True, offset = 0, limit = 100):
+
+    if sort_by is not None and sort_by not in get_df().columns:
+        raise KeyError(sort_by)
+
+    # A negative offset would count back from the end of the rows
+    if offset < 0 or limit < 0:
+        raise ValueError('offset and limit can\'t be negative, got {} and {}'.format(offset, limit))
+
+    rows = cached_table_rows(query_key(choices), sort_by, sort_direction(ascending))
+    page = get_df().iloc[rows[offset:offset + limit]]
+
+    return page, len(rows)
+# ----- Table Pages ----- #
+
+
+
+# ----- Donut Data ----- #
+# Everything the donut chart needs out of the data, kept out of the plotting so
+# it can be reused and timed on its own
+
+
+# The columns that pick out one population count. Every cause row in the same
+# year, county and age group repeats the same Population, so it's counted once
+# per cell and then added up, which works across any number of years, counties
+# and age groups
+population_cells = ['Year', 'State Code', 'County Code', 'Age Group Code']
+
+# Age not stated has no population of its own, the cleaning just carries the
+# one above it down, so it's never counted. A donut of nothing but age not
+# stated has no population to compare against and goes without its outer ring
+not_stated       = 'NS'
+
+
+# The population of every cell in filtered_df, each counted once
+def cell_populations(filtered_df):
+
+    populations = filtered_df.groupby(population_cells, observed = True, sort = False)['Population'].first()
+
+    return populations[populations.index.get_level_values('Age Group Code') != not_stated]
+
+
+
+# None when there's no population to count, i.e. only age not stated
+def population_total(filtered_df):
+
+    populations = cell_populations(filtered_df)
+
+    if len(populations) == 0:
+        return None
+
+    return populations.sum()
+
+
+
+# The same choices with every cause. Rows only exist for causes that had
+# deaths, so the population of a place has to come from all of its rows, not
+# just the ones for the chosen causes
+def population_choices(choices):
+    return list(error_prev(list(choices)))[:4] + ['']
+
+
+
+# The n biggest totals of value per by (any column or list of columns) in
+# order, plus how many others there were and what they add up to. One
+# group-by and one argpartition, only the top n ever get sorted
+def top_n_others(filtered_df, n = 5, by = 'Cause of Death Code', value = 'Deaths'):
+
+    totals = filtered_df.groupby(by, observed = True, sort = False)[value].sum()
+    values = totals.to_numpy()
+
+    if len(values) > n:
+        top = np.argpartition(-values, n)[:n]
+    else:
+        top = np.arange(len(values))
+
+    top  = top[np.argsort(-values[top], kind = 'stable')]
+    rest = np.ones(len(values), dtype = bool)
+    rest[top] = False
+
+    return (totals.index[top].tolist()
+           ,values[top].tolist()
+           ,int(rest.sum())
+           ,values[rest].sum())
+
+
+
+# Both rings of the donut from the totals, with everything past the top causes
+# lumped together as one more if there's anything left over
+def donut_rings(population, dead, subgroup_names, subgroup_size, others, others_size):
+
+    # Total dead of the chosen years, counties and age groups vs the total
+    # population of them. This gives us the total left living
+    if population is None or population != population:
+        group_names = []
+        group_size  = []
+    else:
+        group_names = ['Alive', 'Deceased']
+        group_size  = [population - dead, dead]
+
+    subgroup_names = list(subgroup_names)
+    subgroup_size  = list(subgroup_size)
+
+    if others != 0:
+        subgroup_names.append(str(others) + ' others\ncombined')
+        subgroup_size.append(others_size)
+
+    return group_names, group_size, subgroup_names, subgroup_size
+
+
+
+def donut_data(choices, n = 5):
+
+    filtered_df = df_filter(choices)
+
+    return donut_rings(population_total(df_filter(population_choices(choices)))
+                      ,filtered_df['Deaths'].sum()
+                      ,*top_n_others(filtered_df, n))
+
+
+
+# The same numbers as donut_data for every county, year and age group cell in
+# filtered_df at once, one row per cell. The causes are summed and ranked
+# within their cell in a single sort of the whole frame, so drawing thousands
+# of donuts never has to go back to df_filter. The columns are in the same
+# order donut_rings takes them
+def donut_table(filtered_df, n = 5):
+
+    causes = (filtered_df.groupby(population_cells + ['Cause of Death Code'], observed = True, sort = False)
+                         ['Deaths'].sum()
+                         .reset_index())
+    causes['Cause of Death Code'] = causes['Cause of Death Code'].astype(object)
+    causes = causes.sort_values(population_cells + ['Deaths']
+                               ,ascending = [True] * len(population_cells) + [False]
+                               ,kind      = 'stable'
+                               ,ignore_index = True)
+    rank   = causes.groupby(population_cells, observed = True, sort = False).cumcount().to_numpy()
+
+    top    = causes[rank < n].groupby(population_cells, observed = True)
+    rest   = causes[rank >= n].groupby(population_cells, observed = True)['Deaths']
+    cells  = filtered_df.groupby(population_cells, observed = True)
+
+    # Age not stated cells get no population, the same as donut_data
+    table  = pd.DataFrame({'Population':    cell_populations(filtered_df)
+                          ,'Deaths':        cells['Deaths'].sum()
+                          ,'Top Causes':    top['Cause of Death Code'].agg(list)
+                          ,'Top Deaths':    top['Deaths'].agg(list)
+                          ,'Others':        rest.size()
+                          ,'Others Deaths': rest.sum()})
+
+    table[['Others', 'Others Deaths']] = table[['Others', 'Others Deaths']].fillna(0).astype('int64')
+
+    return table
+# ----- Donut Data ----- #
+
+
+
+# ----- Map Values ----- #
+# One number per county (or per state with level = 'State Code') for the
+# choropleth maps. Deaths is the plain total, 'Crude Rate' is deaths per
+# 100,000 of the population of the chosen years and age groups, with the
+# population counted once per cell over every cause, the same way as the donut
+def map_values(choices, value = 'Deaths', level = 'County Code'):
+
+    filtered_df = df_filter(choices)
+    deaths      = filtered_df.groupby(level, observed = True)['Deaths'].sum()
+
+    if value == 'Deaths':
+        return deaths
+
+    population = (cell_populations(df_filter(population_choices(choices)))
+                             .groupby(level = level, observed = True).sum())
+
+    # Places with people but no deaths from the chosen causes are a rate of 0
+    return (deaths.reindex(population.index, fill_value = 0) / population * 100000).rename('Crude Rate')
+
+
+
+# map_values for every chosen year at once, one row per year and one column
+# per county (or state), from a single group-by. Years with no deaths in a
+# county are 0, the rate is left blank where there's no population for it
+def map_matrix(choices, value = 'Deaths', level = 'County Code'):
+
+    years       = list(error_prev(list(choices))[0])
+    filtered_df = df_filter(choices)
+    deaths      = filtered_df.groupby(['Year', level], observed = True)['Deaths'].sum().unstack(level)
+
+    if value == 'Deaths':
+        return deaths.reindex(years).fillna(0)
+
+    population = (cell_populations(df_filter(population_choices(choices)))
+                             .groupby(level = ['Year', level], observed = True).sum()
+                             .unstack(level))
+
+    return (deaths.reindex_like(population).fillna(0) / population * 100000).reindex(years)
+# ----- Map Values ----- #
+
+
+
+# ----- Store Queries ----- #
+# df_filter straight off the partitioned store instead of the loaded dataset.
+# Only the partitions for the chosen states and years get opened, and the
+# county, age and cause choices are handed to the parquet reader so it skips
+# everything else, so a narrow query costs the same however much is stored.
+# Blank choices mean everything here, there's no loaded data to take the
+# defaults from. Gives back None if nothing in the store matches
+def store_choices(choices):
+
+    normalised = []
+
+    for choice in choices:
+        if type(choice) != list and type(choice) != range:
+            choice = [choice]
+
+        normalised.append(None if len(choice) == 0 or choice[0] == '' else list(choice))
+
+    return normalised
+
+
+
+def df_filter_store(choices, store = store_dir):
+
+    years, states, counties, ages, causes = store_choices(choices)
+
+    filters = [(column, 'in', choice)
+               for column, choice in [['County Code',    counties]
+                                     ,['Age Group Code', ages]]
+               if choice is not None]
+
+    # Exact cause codes can be pushed down too, prefixes and ranges have to
+    # wait until the codes in those partitions are known
+    if causes is not None and all(code_span(code) is None for code in causes):
+        filters.append(('Cause of Death Code', 'in', causes))
+        causes = None
+
+    filtered_df = read_partitions(store, states, years, filters or None)
+
+    if filtered_df is None or causes is None:
+        return filtered_df
+
+    codes = np.array(sorted(str(code) for code in filtered_df['Cause of Death Code'].dropna().unique()))
+    keep  = filtered_df['Cause of Death Code'].isin(expand_cause_codes(causes, codes))
+
+    return filtered_df[keep.to_numpy()]
+# ----- Store Queries ----- #
@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+from statistics import NormalDist
+
+from .dataset import dimensions, label_columns, get_dictionary
+from .query import error_prev, df_filter, cell_populations, population_choices, population_cells
+
+
+# ----- Rates ----- #
+# Deaths on their own can't compare a small county with a big one, or a year
+# where the population was older with one where it was younger. rate_table
+# works out, for every group of any grouping at once:
+#   - the crude rate, deaths per 100,000 of the population
+#   - the age adjusted rate, the crude rate of every age group weighted by the
+#     2000 U.S. standard population, the same way the CDC does it
+#   - confidence intervals for both
+#
+#   rate_table(['', 6, '', '', ''], by = ['Year', 'County Code'])
+#
+# by can be any of the choice columns or their labels, e.g. 'County'
+#
+# Everything is a handful of group-bys and array maths over all the groups
+# together, there's no loop over groups.
+#
+# The intervals are the gamma intervals of Fay and Feuer (1997), which for a
+# crude rate are the exact Poisson interval. They need scipy, without it they
+# fall back to rate +/- z standard errors, which is close once there's 100 or
+# so deaths
+
+
+# 2000 U.S. standard population, per million, in the CDC's age groups
+standard_population = {'1':     13818
+                      ,'1-4':   55317
+                      ,'5-9':   72533
+                      ,'10-14': 73032
+                      ,'15-19': 72169
+                      ,'20-24': 66478
+                      ,'25-34': 135573
+                      ,'35-44': 162613
+                      ,'45-54': 134834
+                      ,'55-64': 87247
+                      ,'65-74': 66037
+                      ,'75-84': 44842
+                      ,'85':    15508
+                      }
+
+# The CDC marks rates from fewer deaths than this as unreliable
+unreliable_deaths   = 20
+
+
+
+# Share of the standard population for each of the chosen age groups, so the
+# weights always add up to 1 over the ages actually being looked at
+def age_weights(ages):
+
+    ages    = [age for age in dict.fromkeys(ages) if age in standard_population]
+    weights = pd.Series([standard_population[age] for age in ages], index = ages, dtype = 'float64')
+
+    return weights / weights.sum()
+
+
+
+# Lower and upper bounds for rates (per person) given their variance and the
+# biggest single weight per person that went into them, all as arrays
+def rate_limits(rate, variance, largest_weight, confidence):
+
+    alpha = 1 - confidence
+
+    try:
+        from scipy.stats import chi2
+
+    except ImportError:
+        z     = NormalDist().inv_cdf(1 - alpha / 2)
+        error = z * np.sqrt(variance)
+        return np.maximum(rate - error, 0), rate + error
+
+    upper_rate     = rate + largest_weight
+    upper_variance = variance + largest_weight ** 2
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        lower = np.where(rate > 0
+                        ,variance / (2 * rate) * chi2.ppf(alpha / 2, 2 * rate ** 2 / variance)
+                        ,0)
+        upper = (upper_variance / (2 * upper_rate)
+                 * chi2.ppf(1 - alpha / 2, 2 * upper_rate ** 2 / upper_variance))
+
+    return lower, upper
+
+
+
+# The code column each label column stands for, e.g. County -> County Code
+code_columns = {label: column for column, label in label_columns.items() if label is not None}
+
+
+def rate_table(choices, by = 'Year', per = 100000, confidence = 0.95):
+
+    by      = [by] if isinstance(by, str) else list(by)
+    age     = 'Age Group Code'
+    choices = error_prev(list(choices))
+
+    for column in by:
+        if column not in dimensions and column not in code_columns:
+            raise ValueError('rates can only be grouped by ' + ', '.join(dimensions + list(code_columns)))
+
+    # Label columns are worked out on their code columns, so two counties with
+    # the same name never share a population, and get their labels back at the
+    # end
+    keys = list(dict.fromkeys(code_columns.get(column, column) for column in by))
+
+    # Population only depends on when, where and what age, so anything else in
+    # by (the cause, say) gets the population of its place
+    population_keys = [column for column in keys if column in population_cells]
+    other_keys      = [column for column in keys if column not in population_cells]
+    age_keys        = list(dict.fromkeys(population_keys + [age]))
+
+    weights = age_weights(choices[3])
+
+    # Population of every age group in every population group, with the
+    # weight each person in it gets
+    populations = (cell_populations(df_filter(population_choices(choices)))
+                   .groupby(level = age_keys, observed = True)
+                   .sum()
+                   .rename('Population')
+                   .reset_index())
+    populations['Weight']            = populations[age].astype(object).map(weights).astype('float64')
+    populations['Weight per Person'] = populations['Weight'] / populations['Population']
+
+    # Deaths of every age group in every group, with the population of that
+    # age group next to it
+    filtered_df = df_filter(choices)
+    deaths      = (filtered_df.groupby(list(dict.fromkeys(keys + [age])), observed = True)['Deaths']
+                              .sum()
+                              .reset_index())
+    deaths      = deaths.merge(populations, on = age_keys, how = 'left')
+
+    deaths['Adjusted']          = deaths['Weight per Person'] * deaths['Deaths']
+    deaths['Adjusted Variance'] = deaths['Weight per Person'] ** 2 * deaths['Deaths']
+
+    rates = (deaths.groupby(keys, observed = True)[['Deaths', 'Adjusted', 'Adjusted Variance']]
+                   .sum()
+                   .reset_index())
+
+    # Totals per population group. Every group with people in it is kept,
+    # with every value of the other columns in the chosen rows, so a group with
+    # no deaths still gets a rate of 0 and an upper limit
+    populations = populations[populations['Weight'].notna()]
+
+    if population_keys:
+        totals = (populations.groupby(population_keys, observed = True)
+                             .agg(**{'Population':     ('Population',        'sum')
+                                    ,'Weight':         ('Weight',            'sum')
+                                    ,'Largest Weight': ('Weight per Person', 'max')})
+                             .reset_index())
+    else:
+        totals = pd.DataFrame({'Population':     [populations['Population'].sum()]
+                              ,'Weight':         [populations['Weight'].sum()]
+                              ,'Largest Weight': [populations['Weight per Person'].max()]})
+
+    if other_keys:
+        others = filtered_df.groupby(other_keys, observed = True).size().index.to_frame(index = False)
+        totals = totals.merge(others, how = 'cross')
+
+    rates = (totals.merge(rates, on = keys, how = 'outer')
+                   .fillna({'Deaths': 0, 'Adjusted': 0, 'Adjusted Variance': 0})
+                   .sort_values(keys, ignore_index = True))
+
+    # The weights are scaled back up to 1 over the age groups each group
+    # actually has, so grouping by age group gives back the crude rate
+    weight         = rates['Weight'].to_numpy(dtype = 'float64')
+    population     = rates['Population'].to_numpy(dtype = 'float64')
+    largest_weight = rates['Largest Weight'].to_numpy(dtype = 'float64') / weight
+    dead           = rates['Deaths'].to_numpy(dtype = 'float64')
+
+    crude          = dead / population
+    crude_variance = dead / population ** 2
+    adjusted       = rates['Adjusted'].to_numpy(dtype = 'float64') / weight
+    variance       = rates['Adjusted Variance'].to_numpy(dtype = 'float64') / weight ** 2
+
+    crude_lower,    crude_upper    = rate_limits(crude,    crude_variance, 1 / population, confidence)
+    adjusted_lower, adjusted_upper = rate_limits(adjusted, variance,       largest_weight, confidence)
+
+    # Back to the columns asked for, labels in place of their codes
+    groups = pd.DataFrame({column: rates[code_columns[column]].map(get_dictionary(code_columns[column]))
+                                   if column in code_columns else rates[column]
+                           for column in by})
+
+    return pd.DataFrame({'Deaths':                            dead.astype('int64')
+                        ,'Population':                        population
+                        ,'Crude Rate':                        crude          * per
+                        ,'Crude Rate Lower':                  crude_lower    * per
+                        ,'Crude Rate Upper':                  crude_upper    * per
+                        ,'Crude Rate Standard Error':         np.sqrt(crude_variance) * per
+                        ,'Age Adjusted Rate':                 adjusted       * per
+                        ,'Age Adjusted Rate Lower':           adjusted_lower * per
+                        ,'Age Adjusted Rate Upper':           adjusted_upper * per
+                        ,'Age Adjusted Rate Standard Error':  np.sqrt(variance) * per
+                        ,'Unreliable':                        dead < unreliable_deaths}
+                       ,index = pd.MultiIndex.from_frame(groups) if len(by) > 1 else pd.Index(groups[by[0]]))
+# ----- Rates ----- #
@@ -0,0 +1,312 @@
+import json
+import asyncio
+import argparse
+import numpy as np
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ProcessPoolExecutor
+
+from . import dataset
+from .dataset import get_df, get_encoding, get_death_cube
+from .query import (df_filter, df_graphing, df_graphing_layers, df_group_totals, df_table, donut_data
+                   ,map_values)
+from .rates import rate_table
+
+
+# ----- Query Server ----- #
+# A small local HTTP/JSON server so a notebook or a web page can ask for
+# df_filter, df_graphing, donut numbers and so on without re-running the whole
+# script every time. The dataset, its dictionaries and the cube are loaded once
+# up front and kept warm. The asyncio loop only reads requests and writes
+# answers, the actual pandas work goes to a pool of worker processes, so a slow
+# query never holds up the others. Workers are forked from the warm process,
+# so they start with the data already in memory.
+#
+#   python -m death_and_statistics.server --port 8000
+#
+# Every query is a POST of a JSON object to its endpoint, or a GET with the
+# same keys as URL parameters (lists JSON encoded), e.g.
+#
+#   POST /graphing  {"choices": ["", 6, 6073, "", ""]}
+#   GET  /donut?choices=[2016,6,6073,"20-24",""]&n=5
+
+default_host  = '127.0.0.1'
+default_port  = 8000
+
+# How many rows /filter sends back at most, the full count is always given
+default_limit = 1000
+
+
+
+def warm():
+    get_df()
+    get_encoding()
+    get_death_cube()
+
+
+
+def frame_json(frame, orient = 'split'):
+    return json.loads(frame.to_json(orient = orient))
+
+
+# numpy numbers aren't JSON serialisable as they are
+def json_default(value):
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    raise TypeError('{!r} is not JSON serializable'.format(value))
+
+
+
+def filter_query(request):
+
+    filtered_df = df_filter(request['choices'])
+    limit       = int(request.get('limit', default_limit))
+
+    return {'rows':            len(filtered_df)
+           ,'filters applied': filtered_df.attrs.get('filters applied', [])
+           ,'data':            frame_json(filtered_df.head(limit), 'records')}
+
+
+# One page of the filtered rows, sorted server side, e.g.
+#   {"choices": ["", 6, "", "", ""], "sort": "Deaths", "ascending": false,
+#    "offset": 200, "limit": 100}
+# ascending has to be a JSON true or false (or that as text), anything else is
+# a 400 from df_table
+def table_query(request):
+
+    offset     = int(request.get('offset', 0))
+    limit      = int(request.get('limit', 100))
+    page, rows = df_table(request['choices']
+                         ,request.get('sort')
+                         ,request.get('ascending', True)
+                         ,offset
+                         ,limit)
+
+    return {'rows':   rows
+           ,'offset': offset
+           ,'limit':  limit
+           ,'data':   frame_json(page, 'records')}
+
+
+def graphing_query(request):
+    return frame_json(df_graphing(request['choices']), 'records')
+
+
+def layers_query(request):
+    return frame_json(df_graphing_layers(request['choices'], int(request['layer'])))
+
+
+def groups_query(request):
+    return frame_json(df_group_totals(request['choices']
+                                     ,request.get('level', 'Group')
+                                     ,request.get('geography')).reset_index())
+
+
+def donut_query(request):
+
+    group_names, group_size, subgroup_names, subgroup_size = donut_data(request['choices']
+                                                                      ,int(request.get('n', 5)))
+
+    return {'group names':    group_names
+           ,'group size':     group_size
+           ,'subgroup names': subgroup_names
+           ,'subgroup size':  subgroup_size}
+
+
+def map_query(request):
+    return frame_json(map_values(request['choices']
+                                ,request.get('value', 'Deaths')
+                                ,request.get('level', 'County Code')).reset_index(), 'records')
+
+
+
+# Crude and age adjusted rates with their intervals, e.g.
+#   {"choices": ["", 6, "", "", ""], "by": ["Year", "County Code"]}
+def rates_query(request):
+    return frame_json(rate_table(request['choices']
+                                ,request.get('by', 'Year')
+                                ,float(request.get('per', 100000))
+                                ,float(request.get('confidence', 0.95))).reset_index(), 'records')
+
+
+
+endpoints = {'/filter':   filter_query
+            ,'/table':    table_query
+            ,'/graphing': graphing_query
+            ,'/layers':   layers_query
+            ,'/groups':   groups_query
+            ,'/donut':    donut_query
+            ,'/map':      map_query
+            ,'/rates':    rates_query
+            }
+
+
+# Runs in a worker. Gives back the finished JSON text so the event loop only
+# has bytes to pass along
+def run_query(path, request):
+    return json.dumps(endpoints[path](request), default = json_default)
+
+
+
+def health_query():
+    return json.dumps({'rows': len(get_df()), 'generation': dataset.generation})
+
+
+
+# GET parameters come in as text, anything that reads as JSON (lists,
+# numbers) is taken as that and the rest is left as a string
+def query_parameters(query):
+
+    request = {}
+
+    for name, values in parse_qs(query, keep_blank_values = True).items():
+        try:
+            request[name] = json.loads(values[-1])
+        except ValueError:
+            request[name] = values[-1]
+
+    return request
+
+
+
+statuses = {200: 'OK'
+           ,204: 'No Content'
+           ,400: 'Bad Request'
+           ,404: 'Not Found'
+           ,405: 'Method Not Allowed'
+           ,500: 'Internal Server Error'
+           }
+
+
+def response(status, body = ''):
+
+    body = body.encode('utf-8')
+
+    # Allowed from anywhere, so a github.io page can call a local server
+    head = ['HTTP/1.1 {} {}'.format(status, statuses[status])
+           ,'Content-Type: application/json'
+           ,'Content-Length: {}'.format(len(body))
+           ,'Access-Control-Allow-Origin: *'
+           ,'Access-Control-Allow-Methods: GET, POST, OPTIONS'
+           ,'Access-Control-Allow-Headers: Content-Type'
+           ,'Connection: close'
+           ]
+
+    return ('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body
+
+
+def error(status, message):
+    return response(status, json.dumps({'error': message}))
+
+
+
+async def answer(pool, method, target, body):
+
+    url = urlsplit(target)
+
+    if method == 'OPTIONS':
+        return response(204)
+
+    if url.path == '/health':
+        return response(200, health_query())
+
+    if url.path not in endpoints:
+        return error(404, 'no endpoint ' + url.path)
+
+    try:
+        if method == 'GET':
+            request = query_parameters(url.query)
+        elif method == 'POST':
+            request = json.loads(body or b'{}')
+        else:
+            return error(405, method + ' is not supported')
+    except ValueError as exception:
+        return error(400, 'bad JSON: ' + str(exception))
+
+    if not isinstance(request, dict) or 'choices' not in request:
+        return error(400, 'the request needs choices')
+
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(pool, run_query, url.path, request)
+    except (KeyError, ValueError, TypeError, IndexError) as exception:
+        return error(400, '{}: {}'.format(type(exception).__name__, exception))
+    except Exception as exception:
+        return error(500, '{}: {}'.format(type(exception).__name__, exception))
+
+    return response(200, result)
+
+
+
+async def handle(pool, reader, writer):
+
+    try:
+        request_line = (await reader.readline()).decode('latin-1').split()
+
+        if len(request_line) != 3:
+            return
+
+        method, target, _ = request_line
+        headers           = {}
+
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        # Only a plain count of bytes, anything else (negative, not a number)
+        # gets a 400 instead of the body being read
+        length = headers.get('content-length', '0')
+
+        if not length.isdigit():
+            writer.write(error(400, 'bad Content-Length: ' + length))
+            await writer.drain()
+            return
+
+        body = await reader.readexactly(int(length))
+
+        writer.write(await answer(pool, method.upper(), target, body))
+        await writer.drain()
+
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+
+    finally:
+        writer.close()
+
+
+
+async def serve(host = default_host, port = default_port, workers = None):
+
+    # Loaded before the pool starts so the workers get it for free
+    warm()
+
+    with ProcessPoolExecutor(max_workers = workers, initializer = warm) as pool:
+
+        server = await asyncio.start_server(lambda reader, writer: handle(pool, reader, writer)
+                                           ,host
+                                           ,port)
+
+        print('Serving {} rows on http://{}:{}'.format(len(get_df()), host, port))
+
+        async with server:
+            await server.serve_forever()
+
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description = 'Serve death_and_statistics queries as JSON')
+    parser.add_argument('--host',    default = default_host)
+    parser.add_argument('--port',    type = int, default = default_port)
+    parser.add_argument('--workers', type = int, default = None)
+    arguments = parser.parse_args()
+
+    asyncio.run(serve(arguments.host, arguments.port, arguments.workers))
+
+
+if __name__ == '__main__':
+    main()
+# ----- Query Server ----- #
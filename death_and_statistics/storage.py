@@ -0,0 +1,262 @@
+import os
+import hashlib
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from .cleaning import CLEANING_VERSION, clean_df, compact_df, memory_report, raw_dtypes, store_dtypes
+
+
+# Can be pointed at another export without editing this, e.g. for benchmarks
+source_path     = os.environ.get('CDC_MORTALITY_CSV'
+                                ,os.path.join('data', 'CDC Mortality Dataframe California 1999 - 2016.csv'))
+cache_dir       = os.path.join('data', 'cache')
+
+
+
+# Hashing the raw file is a lot cheaper than parsing it, so it's what decides
+# whether the cached copy is still good
+def file_hash(path, block_size = 1 << 20):
+
+    hasher = hashlib.sha256()
+
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            hasher.update(block)
+
+    return hasher.hexdigest()
+
+
+
+def cache_path(path):
+
+    key  = file_hash(path)[:16] + '_v' + str(CLEANING_VERSION)
+    name = os.path.splitext(os.path.basename(path))[0]
+
+    return os.path.join(cache_dir, name + ' ' + key + '.parquet')
+
+
+
+# Reads the cleaned frame from the parquet cache if there is one for this exact
+# source file and cleaning version, otherwise does the full CSV parse and clean
+# once and writes the cache for next time
+def load_df(path = source_path, report = False):
+
+    cached = cache_path(path)
+
+    if os.path.exists(cached):
+        df = pd.read_parquet(cached)
+
+        # The cache only has the compacted frame, so the report has to redo
+        # the parse and clean to get the before side. Only when it's asked for
+        if report:
+            print(memory_report(clean_df(pd.read_csv(path, low_memory = False)), df))
+
+        return df
+
+    cleaned_df = clean_df(pd.read_csv(path, low_memory = False))
+    df         = compact_df(cleaned_df)
+
+    if report:
+        print(memory_report(cleaned_df, df))
+
+    del cleaned_df
+
+    try:
+        # Written to a temp file first so a crash never leaves a half cache
+        os.makedirs(cache_dir, exist_ok = True)
+        df.to_parquet(cached + '.tmp', index = False)
+        os.replace(cached + '.tmp', cached)
+
+    # No parquet engine installed, just go without the cache
+    except ImportError:
+        pass
+
+    return df
+
+
+
+# ----- Chunked Ingest ----- #
+# For files too big to read in one go (the whole US). Each chunk is cleaned the
+# same way as the full file and written straight out to the store's partitions,
+# so memory stays at one chunk no matter how many files or states go in
+
+store_dir = os.path.join('data', 'store')
+
+
+def clean_chunks(path, chunk_size = 200000):
+
+    carry = None
+
+    for chunk in pd.read_csv(path, chunksize = chunk_size, dtype = raw_dtypes):
+
+        last = chunk.iloc[[-1]].copy()
+
+        # The Population ffill needs to see the last row of the chunk before,
+        # so it gets stuck on the front and dropped again after cleaning
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index = True)
+
+        cleaned_chunk = clean_df(chunk)
+
+        if carry is not None:
+            cleaned_chunk = cleaned_chunk.iloc[1:]
+
+        last['Population'] = str(cleaned_chunk['Population'].iloc[-1])
+        carry              = last
+
+        yield cleaned_chunk
+
+
+
+# ----- Partitions ----- #
+# The store is split into a folder per state and a folder per year inside that,
+#   store/6/2016/part-00000.parquet
+# so a query for one county in one year only has to open that state and year.
+# Each write is a new part file, nothing already in the store gets touched
+def partition_path(store, state, year):
+    return os.path.join(store, str(int(state)), str(int(year)))
+
+
+
+def write_part(cleaned_df, store = store_dir):
+
+    part_paths = []
+
+    for (state, year), partition in cleaned_df.groupby(['State Code', 'Year'], sort = False):
+
+        folder    = partition_path(store, state, year)
+        os.makedirs(folder, exist_ok = True)
+
+        part      = len([name for name in os.listdir(folder) if name.endswith('.parquet')])
+        part_path = os.path.join(folder, 'part-{:05d}.parquet'.format(part))
+
+        partition.astype(store_dtypes).to_parquet(part_path, index = False)
+        part_paths.append(part_path)
+
+    return part_paths
+
+
+
+# Part files sitting straight in the store, from before it was partitioned
+def loose_parts(store = store_dir):
+    return sorted(os.path.join(store, name)
+                  for name in os.listdir(store)
+                  if name.endswith('.parquet') and os.path.isfile(os.path.join(store, name)))
+
+
+
+# Moves the loose part files of an old store into the state and year folders.
+# Each one is only deleted once its rows are written to the partitions
+def migrate_store(store = store_dir):
+
+    part_paths = loose_parts(store)
+
+    for part_path in part_paths:
+        write_part(pd.read_parquet(part_path), store)
+        os.remove(part_path)
+
+    return len(part_paths)
+
+
+
+# Every part file in the partitions that match, None for states or years means
+# all of them. A store with loose part files would silently give back only
+# part of the data, so it has to be migrated first
+def partition_files(store = store_dir, states = None, years = None):
+
+    part_paths = []
+
+    if not os.path.isdir(store):
+        return part_paths
+
+    if loose_parts(store):
+        raise ValueError(store + ' has part files from before it was partitioned'
+                         ', run migrate_store(' + repr(store) + ') to move them into partitions')
+
+    for state in sorted(os.listdir(store)):
+        if not state.isdigit() or (states is not None and int(state) not in states):
+            continue
+
+        for year in sorted(os.listdir(os.path.join(store, state))):
+            if not year.isdigit() or (years is not None and int(year) not in years):
+                continue
+
+            folder      = os.path.join(store, state, year)
+            part_paths += [os.path.join(folder, name)
+                           for name in sorted(os.listdir(folder))
+                           if name.endswith('.parquet')]
+
+    return part_paths
+
+
+
+# Reads only the partitions for the given states and years. filters get pushed
+# down into the parquet reader, e.g. [('County Code', 'in', [6073])], so rows
+# for other counties in the same partition never get loaded either
+def read_partitions(store = store_dir, states = None, years = None, filters = None):
+
+    part_paths = partition_files(store, states, years)
+
+    if not part_paths:
+        return None
+
+    return compact_df(pd.read_parquet(part_paths, filters = filters))
+# ----- Partitions ----- #
+
+
+
+# Appends every file's chunks to the store as new part files, returns the
+# number of rows written
+def ingest_chunks(paths, store = store_dir, chunk_size = 200000):
+
+    if isinstance(paths, str):
+        paths = [paths]
+
+    rows = 0
+
+    for path in paths:
+        for cleaned_chunk in clean_chunks(path, chunk_size):
+            write_part(cleaned_chunk, store)
+            rows += len(cleaned_chunk)
+
+    return rows
+
+
+
+def load_store(store = store_dir):
+    return read_partitions(store)
+# ----- Chunked Ingest ----- #
+
+
+
+# ----- Parallel Ingest ----- #
+# The real input is a pile of per-year or per-state exports, and parsing them is
+# all CPU, so each file gets its own worker process. Results are put back
+# together in file name order and then stable sorted, so the merged frame comes
+# out the same no matter which worker finishes first
+
+def clean_file(path):
+    return clean_df(pd.read_csv(path, dtype = raw_dtypes)).astype(store_dtypes)
+
+
+
+def ingest_directory(directory, workers = None):
+
+    paths = sorted(os.path.join(directory, name)
+                   for name in os.listdir(directory)
+                   if name.lower().endswith('.csv'))
+
+    with ProcessPoolExecutor(max_workers = workers) as pool:
+        cleaned_frames = list(pool.map(clean_file, paths))
+
+    merged_df = pd.concat(cleaned_frames, ignore_index = True)
+    merged_df = merged_df.sort_values(['Year'
+                                      ,'State Code'
+                                      ,'County Code'
+                                      ,'Age Group Code'
+                                      ,'Cause of Death Code']
+                                      ,kind = 'mergesort'
+                                      ,ignore_index = True)
+
+    return compact_df(merged_df)
+# ----- Parallel Ingest ----- #
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+
+from . import codes
+
+
+# The giant lists of death codes put into the tree they're laid out in, so a
+# whole branch (all of Cancer, all of Trauma) can be picked out at once.
+#   Category -> Group -> Subgroup -> codes
+# The subgroups are the names of the lists in codes.py
+
+taxonomy_levels = ['Category', 'Group', 'Subgroup']
+
+cause_taxonomy  = {'Medical': {'Cancer':                 ['Oral_Cancer'
+                                                         ,'GI_Cancer'
+                                                         ,'Pulmonary_Cancer'
+                                                         ,'Renal_Cancer'
+                                                         ,'Skeletal_Cancer'
+                                                         ,'Skin_Cancer'
+                                                         ,'Brain_Cancer'
+                                                         ,'Thyroid_Cancer'
+                                                         ,'Lymphatic_Cancer'
+                                                         ,'Blood_Cancer'
+                                                         ,'Female_Cancer'
+                                                         ,'Male_Cancer'
+                                                         ,'Misc_Cancer']
+                              ,'Heart':                  ['Valve'
+                                                         ,'Hypertension'
+                                                         ,'MI'
+                                                         ,'MI_Specific'
+                                                         ,'Haemorrhage'
+                                                         ,'Circulatory']
+                              ,'Brain':                  ['Stroke']
+                              ,'Infections':             ['Flu'
+                                                         ,'Pneumonia'
+                                                         ,'Bronchitis']
+                              ,'Disease':                ['Gastro'
+                                                         ,'Hepatitis'
+                                                         ,'HIV'
+                                                         ,'Motor_Disease'
+                                                         ,'Immune_Disease'
+                                                         ,'Blood_And_Fluid'
+                                                         ,'Diabetes'
+                                                         ,'Obesity'
+                                                         ,'Protein'
+                                                         ,'Thyroid'
+                                                         ,'COPD'
+                                                         ,'Pulmonary']
+                              ,'GI':                     ['GI'
+                                                         ,'Hepatic'
+                                                         ,'Gallbladder'
+                                                         ,'Pancreas'
+                                                         ,'Renal']
+                              ,'Joints':                 ['Joints'
+                                                         ,'Osteo'
+                                                         ,'Skin']
+                              ,'Age':                    ['Prebirth'
+                                                         ,'Neonate_Disease'
+                                                         ,'Seniority'
+                                                         ,'Dementia'
+                                                         ,'Mental_Disorder'
+                                                         ,'Cerebral']
+                              ,'Gender Specific':        ['Mens_Disease'
+                                                         ,'Child_birth']
+                              ,'Self-Inflicted Disease': ['Alcoholism']
+                              }
+                  ,'Trauma':  {'Motor-Vehicle Collision': ['Pedestrian'
+                                                          ,'Motorcycle'
+                                                          ,'Car']
+                              ,'Accidental':              ['Fall'
+                                                          ,'Firarms'
+                                                          ,'Airway_Obstruction'
+                                                          ,'Imolation'
+                                                          ,'Poisoning'
+                                                          ,'Misc']
+                              ,'Suicide':                 ['Self_Harm'
+                                                          ,'Self_Firearm']
+                              ,'Homicide':                ['Homicide_Firearm'
+                                                          ,'Homicide_Object']
+                              }
+                  }
+
+# Anything in the data that isn't in one of the lists
+unmapped_group  = 'Other'
+
+
+
+# One row per code with where it sits at every level. A few codes are in more
+# than one list (C76.2 is in Renal_Cancer and Skin_Cancer), those stay with the
+# first list they show up in and get noted in taxonomy_conflicts
+def build_cause_groups(taxonomy):
+
+    rows      = {}
+    conflicts = {}
+
+    for category, groups in taxonomy.items():
+        for group, subgroups in groups.items():
+            for subgroup in subgroups:
+                for code in getattr(codes, subgroup):
+
+                    if code not in rows:
+                        rows[code] = [category, group, subgroup]
+                    elif rows[code][2] != subgroup:
+                        conflicts.setdefault(code, [rows[code][2]]).append(subgroup)
+
+    cause_groups = pd.DataFrame.from_dict(rows, orient = 'index', columns = taxonomy_levels)
+    cause_groups = cause_groups.rename_axis('Cause of Death Code')
+
+    return cause_groups, conflicts
+
+
+cause_groups, taxonomy_conflicts = build_cause_groups(cause_taxonomy)
+
+
+
+# Every code under any of the given names, at whatever level each one is, e.g.
+# group_codes('Homicide_Firearm', 'Self_Firearm') or group_codes('Cancer').
+# A few names are both a group and one of its subgroups (GI, Joints), level
+# picks which one is meant, e.g. group_codes('GI', level = 'Subgroup')
+def group_codes(*names, level = None):
+
+    levels = cause_groups if level is None else cause_groups[[level]]
+    found  = []
+
+    for name in names:
+        found += levels.index[(levels == name).any(axis = 1)].tolist()
+
+    return list(dict.fromkeys(found))
+
+
+
+# Swaps each cause code for the group it's in at the given level. Only the
+# distinct codes get looked up, every row then just takes its group from an
+# array by position, so it's one pass however many groups are asked about
+def cause_group_column(causes, level = 'Group'):
+
+    causes    = causes.astype('category')
+    groups    = pd.Index(list(cause_groups[level].unique()) + [unmapped_group])
+
+    labels    = cause_groups[level].reindex(causes.cat.categories).fillna(unmapped_group)
+    translate = groups.get_indexer(labels)
+
+    # Missing codes come through as -1, which lands on the extra unmapped slot
+    translate = np.append(translate, groups.get_loc(unmapped_group))
+
+    return pd.Series(pd.Categorical.from_codes(translate[causes.cat.codes.to_numpy()], groups)
+                    ,index = causes.index
+                    ,name  = level)